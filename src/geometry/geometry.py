@@ -22,6 +22,10 @@ class Geometry:
             "rebuildCurveds": "F",
         }
 
+    @property
+    def hopr_options(self):
+        return self._hopr_options
+
     def set_hopr_options(self,
                          debugvisu: bool = True,
                          logging: bool = False,
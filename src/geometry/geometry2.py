@@ -1,3 +1,5 @@
+import numpy as np
+
 from src.geometry.geometry import Geometry
 from src.primitive.parser.hopr_ini import HoprINI
 
@@ -44,6 +46,7 @@ class Geometry2(Geometry):
         ]
         self._symmetric_axis_boundaries = []
         self._curved_boundaries = []
+        self._cell_polygons = None
 
     @property
     def axis_symmetry(self):
@@ -54,6 +57,15 @@ class Geometry2(Geometry):
         self._axis_symmetry = value
         self._options["Particles-Symmetry2DAxisymmetric"] = "T" if value else "F"
 
+    @property
+    def radial_weighting(self):
+        return self._radial_weighting
+
+    @radial_weighting.setter
+    def radial_weighting(self, value):
+        self._radial_weighting = value
+        self._options["Particles-RadialWeighting"] = "T" if value else "F"
+
     @property
     def options(self):
         return self._options
@@ -179,3 +191,36 @@ class Geometry2(Geometry):
 
     def get_dimensions(self) -> int:
         return 2
+
+    def get_cell_centers(self):
+        return np.concatenate([polygons.mean(axis=1) for polygons in self.__read_cell_polygons()])
+
+    def get_cell_areas(self):
+        # Shoelace formula for all cells of the same type at once
+        areas = []
+        for polygons in self.__read_cell_polygons():
+            x, y = polygons[:, :, 0], polygons[:, :, 1]
+            areas.append(0.5 * np.abs((x * np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1) * y).sum(axis=1)))
+        return np.concatenate(areas)
+
+    def get_cell_sizes(self):
+        return np.sqrt(self.get_cell_areas())
+
+    def get_cell_volumes(self):
+        # Axisymmetric cells are revolved around the x-axis, planar cells are extruded by ZLength
+        if self._axis_symmetry:
+            return self.get_cell_areas() * 2 * np.pi * np.abs(self.get_cell_centers()[:, 1])
+        return self.get_cell_areas() * self._hopr_options["ZLength"]
+
+    def get_number_of_cells(self) -> int:
+        return sum(len(polygons) for polygons in self.__read_cell_polygons())
+
+    def __read_cell_polygons(self):
+        if self._cell_polygons is None:
+            import meshio
+
+            mesh = meshio.read(self.mesh_file)
+            points = mesh.points[:, :2] * self._hopr_options["Meshscale"]
+            self._cell_polygons = [points[cells.data] for cells in mesh.cells if cells.type in ("triangle", "quad")]
+
+        return self._cell_polygons
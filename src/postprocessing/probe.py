@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+from src.reader.dsmc_state import DSMCState
+from src.reader.mesh import Mesh
+from src.utility.utility import find_dsmc_state_files
+
+# One search tree per mesh file and modification, shared by all probes of the process
+_trees = {}
+_trees_lock = threading.Lock()
+
+
+def mesh_tree(mesh_file: str):
+    status = os.stat(mesh_file)
+    key = (os.path.abspath(mesh_file), status.st_size, status.st_mtime_ns)
+    with _trees_lock:
+        if key not in _trees:
+            with Mesh(mesh_file) as mesh:
+                _trees[key] = cKDTree(mesh.barycenters)
+        return _trees[key]
+
+
+class Probe:
+
+    def __init__(self,
+                 mesh_file: str,
+                 points,
+                 neighbours: int = 8,
+                 power: float = 2.0,
+                 cache_directory: str = None):
+        if cache_directory is None:
+            cache_directory = os.path.expanduser("~/.cache/atlas/probes")
+        os.makedirs(cache_directory, exist_ok=True)
+
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        if points.shape[1] != 3:
+            raise ValueError("Probe points must have three coordinates.")
+        if neighbours < 1:
+            raise ValueError("At least one neighbour is required.")
+
+        self.mesh_file = mesh_file
+        self.points = points
+        self._neighbours = neighbours
+        self._power = power
+        self._cache_directory = cache_directory
+        self._weights = None
+
+    @classmethod
+    def line(cls, mesh_file: str, start, end, number_of_points: int = 100, **kwargs):
+        start, end = np.asarray(start, dtype=float), np.asarray(end, dtype=float)
+        return cls(mesh_file, start + np.linspace(0, 1, number_of_points)[:, None] * (end - start), **kwargs)
+
+    @property
+    def distances(self):
+        # Distance of every point from the first point, the abscissa of a line
+        return np.concatenate([[0], np.cumsum(np.linalg.norm(np.diff(self.points, axis=0), axis=1))])
+
+    @property
+    def weights(self):
+        if self._weights is None:
+            self._weights = self._load_or_compute_weights()
+        return self._weights
+
+    def sample(self, state: DSMCState or str, fields: list = None) -> dict:
+        if isinstance(state, str):
+            with DSMCState(state) as opened_state:
+                return self.sample(opened_state, fields)
+
+        if state.number_of_elements != self.weights.shape[1]:
+            raise ValueError(f"{state.h5_file} does not belong to the mesh {self.mesh_file}.")
+
+        return {name: self._apply(values) for name, values in state.fields(fields).items()}
+
+    def time_series(self, directory_path: str, fields: list = None):
+        # The weights are applied to every DSMCState file of the case, the spatial search is done once
+        times, samples = [], {}
+        for h5_file in find_dsmc_state_files(directory_path):
+            with DSMCState(f"{directory_path}/{h5_file}") as state:
+                times.append(state.time)
+                for name, values in self.sample(state, fields).items():
+                    samples.setdefault(name, []).append(values)
+
+        return np.array(times), {name: np.array(values) for name, values in samples.items()}
+
+    def _apply(self, values):
+        # Cells without particles are NaN, the weights of the remaining neighbours are normalized again
+        valid = np.isfinite(values)
+        weighted = self.weights @ np.where(valid, values, 0)
+        total = self.weights @ valid.astype(float)
+        return weighted / np.where(total > 0, total, np.nan)
+
+    def _load_or_compute_weights(self):
+        cache_file = f"{self._cache_directory}/{self._key()}.npz"
+        if os.path.exists(cache_file):
+            return sparse.load_npz(cache_file)
+
+        weights = self._compute_weights()
+
+        # Write a temporary file first so that an interrupted save never leaves a partial cache entry
+        temporary_file = f"{cache_file}.{os.getpid()}.npz"
+        sparse.save_npz(temporary_file, weights)
+        os.replace(temporary_file, cache_file)
+        return weights
+
+    def _compute_weights(self):
+        # Inverse distance weights of the nearest element barycenters, a point on a barycenter takes its value
+        tree = mesh_tree(self.mesh_file)
+        neighbours = min(self._neighbours, tree.n)
+        distances, elements = tree.query(self.points, k=neighbours)
+        distances, elements = distances.reshape(len(self.points), -1), elements.reshape(len(self.points), -1)
+
+        exact = distances == 0
+        weights = np.where(exact.any(axis=1, keepdims=True), exact.astype(float),
+                           1 / np.maximum(distances ** self._power, np.finfo(float).tiny))
+        weights /= weights.sum(axis=1, keepdims=True)
+
+        rows = np.repeat(np.arange(len(self.points)), neighbours)
+        return sparse.csr_matrix((weights.ravel(), (rows, elements.ravel())), shape=(len(self.points), tree.n))
+
+    def _key(self) -> str:
+        # The mesh is identified by its path, size and modification time, hashing its contents would cost more
+        status = os.stat(self.mesh_file)
+        hasher = hashlib.sha256()
+        hasher.update(f"{os.path.abspath(self.mesh_file)}:{status.st_size}:{status.st_mtime_ns}".encode())
+        hasher.update(f"{self._neighbours}:{self._power}".encode())
+        hasher.update(self.points.tobytes())
+        return hasher.hexdigest()
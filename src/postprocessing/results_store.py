@@ -0,0 +1,165 @@
+import csv
+import os
+import threading
+
+import h5py
+import numpy as np
+
+from src.fluid.fluid import Fluid
+from src.geometry.geometry import Geometry
+from src.reader.dsmc_state import DSMCState
+from src.reader.dsmc_surf_state import DSMCSurfState
+from src.reader.mesh import _decode
+from src.utility.catalog import catalog
+from src.utility.utility import find_dsmc_state_files
+from src.utility.warm_start import case_parameters
+
+# h5py files are not safe to write from several threads, e.g. the postprocessing threads of a pipeline
+_lock = threading.Lock()
+
+
+class ResultsStore:
+
+    def __init__(self, store_file: str = "./results.h5"):
+        self.store_file = store_file
+
+    @property
+    def columns(self):
+        if not os.path.exists(self.store_file):
+            return []
+        with h5py.File(self.store_file, "r") as file:
+            return list(file.keys())
+
+    @property
+    def number_of_cases(self) -> int:
+        if not os.path.exists(self.store_file):
+            return 0
+        with h5py.File(self.store_file, "r") as file:
+            return file["case"].shape[0]
+
+    def add(self, directory_path: str, project_name: str, fluid: Fluid, geometry: Geometry):
+        row = {"case": os.path.abspath(directory_path), "project_name": project_name}
+        row.update(self.extract_inputs(fluid, geometry))
+        # Planar and axisymmetric cases can share a store, the geometry of each case decides
+        row.update(self.extract_outputs(directory_path, axisymmetric=bool(geometry.is_axis_symmetry())))
+        self.write(row)
+        return row
+
+    def write(self, row: dict):
+        # One column per quantity, a case that is written again replaces its row
+        with _lock, h5py.File(self.store_file, "a") as file:
+            number_of_cases = file["case"].shape[0] if "case" in file else 0
+            cases = [_decode(case) for case in file["case"][:]] if "case" in file else []
+            index = cases.index(row["case"]) if row["case"] in cases else number_of_cases
+
+            size = max(number_of_cases, index + 1)
+            # HDF5 reads a slash in a column name as a group
+            row = {column.replace("/", "|"): value for column, value in row.items()}
+            for column in set(file.keys()) | set(row):
+                if column not in file:
+                    _create_column(file, column, row[column], number_of_cases)
+                dataset = file[column]
+                if dataset.shape[0] < size:
+                    dataset.resize((size,))
+                    dataset[number_of_cases:] = _missing(dataset)
+                if column in row:
+                    dataset[index] = row[column]
+
+    def query(self, columns: list = None, where: dict = None) -> dict:
+        # where maps a column to a value or to a (min, max) range
+        if not os.path.exists(self.store_file):
+            return {}
+
+        with h5py.File(self.store_file, "r") as file:
+            mask = np.ones(file["case"].shape[0], dtype=bool)
+            for column, condition in (where or {}).items():
+                values = _read(file[column])
+                if isinstance(condition, tuple):
+                    mask &= (values >= condition[0]) & (values <= condition[1])
+                else:
+                    mask &= values == condition
+
+            if columns is None:
+                columns = list(file.keys())
+            return {column: _read(file[column])[mask] for column in columns}
+
+    @staticmethod
+    def extract_inputs(fluid: Fluid, geometry: Geometry) -> dict:
+        inputs = {f"input:{key}": value for key, value in case_parameters(fluid, geometry).items()}
+        for key, value in fluid.get_properties().items():
+            if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+                inputs[f"fluid:{key}"] = value
+        inputs["fluid:macro_particle_factor"] = float(fluid.macro_particle_factor)
+        inputs["fluid:collision_model"] = str(fluid.collision_model)
+        return inputs
+
+    @staticmethod
+    def extract_outputs(directory_path: str, axisymmetric: bool = False) -> dict:
+        outputs = {}
+
+        # Last values of the integral quantities, e.g. the particle number and the mass flows of the surface fluxes
+        part_analyze = f"{directory_path}/PartAnalyze.csv"
+        if os.path.exists(part_analyze):
+            with open(part_analyze) as file:
+                rows = [row for row in csv.reader(file) if row]
+            if len(rows) > 1:
+                for name, value in zip(rows[0], rows[-1]):
+                    try:
+                        outputs[f"PartAnalyze:{name.strip()}"] = float(value)
+                    except ValueError:
+                        continue
+
+        # Volume weighted means of the sampled fields of the last DSMCState file
+        # Axisymmetric cells weigh with their revolved volume, not with the volume of the extruded slab
+        dsmc_state_files = find_dsmc_state_files(directory_path)
+        if dsmc_state_files:
+            with DSMCState(f"{directory_path}/{dsmc_state_files[-1]}") as state:
+                with state.mesh() as mesh:
+                    volumes = mesh.revolved_volumes if axisymmetric else mesh.volumes
+                outputs["time"] = state.time
+                for name, mean in zip(state.variable_names, _volume_means(state, volumes)):
+                    outputs[f"mean:{name}"] = mean
+
+        # Integrals of the surface sampling per boundary of the last DSMCSurfState file
+        surface_state_files = catalog(directory_path).files("DSMCSurfState")
+        if surface_state_files:
+            with DSMCSurfState(f"{directory_path}/{surface_state_files[-1]}", axisymmetric=axisymmetric) as state:
+                for boundary, area in state.areas().items():
+                    outputs[f"surface:{boundary}:area"] = area
+                for name, values in state.integrals().items():
+                    for boundary, value in values.items():
+                        outputs[f"surface:{boundary}:{name}"] = value
+
+        return outputs
+
+
+def _volume_means(state: DSMCState, volumes: np.ndarray):
+    # Empty cells are written as NaN, they do not count
+    weighted_sum = np.zeros(len(state.variable_names))
+    weight = np.zeros(len(state.variable_names))
+    for elements in state.chunks():
+        values = state.read(elements)
+        valid = np.isfinite(values)
+        weighted_sum += np.where(valid, values, 0).T @ volumes[elements]
+        weight += valid.T @ volumes[elements]
+    return weighted_sum / np.where(weight > 0, weight, np.nan)
+
+
+def _create_column(file: h5py.File, column: str, value, size: int):
+    if isinstance(value, str):
+        dataset = file.create_dataset(column, shape=(size,), maxshape=(None,), chunks=(1024,),
+                                      dtype=h5py.string_dtype())
+    else:
+        dataset = file.create_dataset(column, shape=(size,), maxshape=(None,), chunks=(1024,), dtype=np.float64)
+    dataset[:] = _missing(dataset)
+
+
+def _missing(dataset: h5py.Dataset):
+    return "" if dataset.dtype.kind == "O" else np.nan
+
+
+def _read(dataset: h5py.Dataset):
+    values = dataset[:]
+    if dataset.dtype.kind == "O":
+        return np.array([_decode(value) for value in values])
+    return values
@@ -0,0 +1,117 @@
+import h5py
+import numpy as np
+
+from src.reader.dsmc_state import DSMCState
+from src.utility.utility import find_dsmc_state_files
+
+
+class TimeAverage:
+
+    def __init__(self,
+                 directory_path: str,
+                 start_time: float = None,
+                 end_time: float = None):
+        self.directory_path = directory_path
+        self._start_time = start_time
+        self._end_time = end_time
+
+        self._times = []
+        self._variable_names = None
+        self._mesh_file = None
+        self._count = 0
+        self._mean = None
+        self._m2 = None
+        self._min = None
+        self._max = None
+
+    @property
+    def times(self):
+        return self._times
+
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def variance(self):
+        if self._count < 2:
+            return np.zeros_like(self._mean)
+        return self._m2 / (self._count - 1)
+
+    @property
+    def min(self):
+        return self._min
+
+    @property
+    def max(self):
+        return self._max
+
+    def find_files(self):
+        # Same files as Runner._find_h5files, in time order and inside the time window
+        files = []
+        for h5_file in find_dsmc_state_files(self.directory_path):
+            with h5py.File(f"{self.directory_path}/{h5_file}", "r") as file:
+                time = float(np.ravel(file.attrs["Time"])[0])
+            if self._start_time is not None and time < self._start_time:
+                continue
+            if self._end_time is not None and time > self._end_time:
+                continue
+            files.append((time, h5_file))
+        files.sort()
+
+        return [h5_file for _, h5_file in files]
+
+    def run(self, output_file: str = None) -> str:
+        h5_files = self.find_files()
+        if len(h5_files) == 0:
+            raise ValueError(f"No DSMCState files found in {self.directory_path}.")
+
+        for h5_file in h5_files:
+            with DSMCState(f"{self.directory_path}/{h5_file}") as state:
+                self.add(state)
+
+        if output_file is None:
+            project_name = h5_files[0].split("_DSMCState_")[0]
+            output_file = f"{project_name}_TimeAverage_{self._times[0]:.9E}_{self._times[-1]:.9E}.h5"
+
+        self.write(f"{self.directory_path}/{output_file}")
+        return output_file
+
+    def add(self, state: DSMCState):
+        # Welford's update of the running mean and variance, only one snapshot is kept in memory
+        snapshot = state.read()
+
+        if self._mean is None:
+            self._variable_names = state.variable_names
+            self._mesh_file = state.mesh_file
+            self._mean = np.zeros_like(snapshot)
+            self._m2 = np.zeros_like(snapshot)
+            self._min = snapshot.copy()
+            self._max = snapshot.copy()
+        elif state.variable_names != self._variable_names:
+            raise ValueError(f"The variables of {state.h5_file} do not match the previous files.")
+
+        self._count += 1
+        delta = snapshot - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (snapshot - self._mean)
+        np.minimum(self._min, snapshot, out=self._min)
+        np.maximum(self._max, snapshot, out=self._max)
+        self._times.append(state.time)
+
+    def write(self, output_path: str):
+        # ElemData holds the mean and the attributes are on the root as in a DSMCState file, e.g. for piclas2vtk
+        variable_names = np.array([name.encode() for name in self._variable_names])
+
+        with h5py.File(output_path, "w") as file:
+            file.attrs["VarNamesAdd"] = variable_names
+            file.attrs["Time"] = [self._times[-1]]
+            file.attrs["MeshFile"] = [self._mesh_file.split("/")[-1].encode()]
+            file.attrs["NumberOfSamples"] = self._count
+            file.attrs["SampleTimes"] = self._times
+
+            for name, data in (("ElemData", self._mean),
+                               ("ElemData_Variance", self.variance),
+                               ("ElemData_Min", self._min),
+                               ("ElemData_Max", self._max)):
+                file.create_dataset(name, data=data)
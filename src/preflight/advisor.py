@@ -0,0 +1,78 @@
+import numpy as np
+
+from src.fluid.fluid import Fluid
+from src.geometry.geometry import Geometry
+from src.preflight.estimator import Estimator
+from src.preflight.kinetics import mean_collision_time, mean_free_path, most_probable_speed
+
+
+class Advisor:
+
+    def __init__(self,
+                 fluid: Fluid,
+                 geometry: Geometry,
+                 number_densities=None,
+                 temperatures=None):
+        self.__fluid = fluid
+        self.__geometry = geometry
+        self.__estimator = Estimator(fluid=fluid, geometry=geometry)
+
+        # Per-cell values of a pilot run, or the boundary extremes of the fluid
+        if number_densities is None:
+            number_densities = self.__estimator.cell_number_densities()[1]
+        if temperatures is None:
+            temperatures = np.full(geometry.get_number_of_cells(), self.__max_temperature())
+
+        self._number_densities = np.asarray(number_densities, dtype=float)
+        self._temperatures = np.asarray(temperatures, dtype=float)
+
+    def mean_free_paths(self):
+        return mean_free_path(self._number_densities, self._temperatures, self.__fluid.get_properties())
+
+    def collision_times(self):
+        return mean_collision_time(self._number_densities, self._temperatures, self.__fluid.get_properties())
+
+    def time_step(self, collision_fraction: float = 0.2, courant: float = 0.3) -> float:
+        # The time step must resolve the mean collision time and a particle must not cross a cell in one step
+        speeds = self.__max_velocity() + 3 * most_probable_speed(self._temperatures,
+                                                                 self.__fluid.get_properties()["MassIc"])
+        transit_times = self.__geometry.get_cell_sizes() / speeds
+
+        return float(min(collision_fraction * self.collision_times().min(), courant * transit_times.min()))
+
+    def macro_particle_factor(self, particles_per_cell: float = 20, percentile: float = 10) -> float:
+        # Most cells reach the target particles per cell at the lowest boundary density
+        low = self.__estimator.cell_number_densities()[0]
+        real_particles = low * self.__geometry.get_cell_volumes()
+
+        return float(np.percentile(real_particles, percentile) / particles_per_cell)
+
+    def advise(self, particles_per_cell: float = 20) -> dict:
+        mean_free_paths = self.mean_free_paths()
+        cell_sizes = self.__geometry.get_cell_sizes()
+
+        return {
+            "time_step": self.time_step(),
+            "macro_particle_factor": self.macro_particle_factor(particles_per_cell=particles_per_cell),
+            "mean_free_path_min": float(mean_free_paths.min()),
+            "collision_time_min": float(self.collision_times().min()),
+            # Cells larger than a third of the mean free path do not resolve the collisions
+            "coarse_cell_fraction": float(np.mean(cell_sizes > mean_free_paths / 3)),
+        }
+
+    def apply(self, particles_per_cell: float = 20) -> float:
+        macro_particle_factor = self.macro_particle_factor(particles_per_cell=particles_per_cell)
+        self.__fluid.macro_particle_factor = macro_particle_factor
+        return macro_particle_factor
+
+    def __max_temperature(self) -> float:
+        temperatures = [surface_flux["MWTemperatureIC"] for surface_flux in self.__fluid.surface_fluxes]
+        temperatures += [internal_flux["MWTemperatureIC"] for internal_flux in self.__fluid.internal_fluxes]
+        temperatures += [boundary["WallTemp"] for boundary in self.__geometry.get_all_boundaries()
+                         if "WallTemp" in boundary]
+        return float(max(temperatures))
+
+    def __max_velocity(self) -> float:
+        velocities = [surface_flux["VeloIC"] for surface_flux in self.__fluid.surface_fluxes]
+        velocities += [internal_flux["VeloIC"] for internal_flux in self.__fluid.internal_fluxes]
+        return float(max(velocities, default=0))
@@ -0,0 +1,71 @@
+import numpy as np
+
+from src.fluid.fluid import Fluid
+from src.geometry.geometry import Geometry
+from src.preflight.estimator import Estimator
+
+
+class CollisionPartner:
+
+    # PICLAS defaults of the octree split thresholds for 2D and 3D meshes
+    OCTREE_PART_NUM_NODE = {2: 40, 3: 80}
+    OCTREE_PART_NUM_NODE_MIN = {2: 28, 3: 50}
+
+    def __init__(self,
+                 use_octree: bool = False,
+                 use_nearest_neighbour: bool = True,
+                 octree_part_num_node: int = None,
+                 octree_part_num_node_min: int = None,
+                 reason: str = None):
+        self._options = {
+            "Particles-DSMC-UseOctree": "T" if use_octree else "F",
+            "Particles-DSMC-UseNearestNeighbour": "T" if use_nearest_neighbour else "F",
+        }
+        if use_octree and octree_part_num_node is not None:
+            self._options["Particles-OctreePartNumNode"] = octree_part_num_node
+        if use_octree and octree_part_num_node_min is not None:
+            self._options["Particles-OctreePartNumNodeMin"] = octree_part_num_node_min
+        self._reason = reason
+
+    @property
+    def options(self):
+        return self._options
+
+    @options.setter
+    def options(self, value):
+        self._options = value
+
+    @property
+    def reason(self):
+        return self._reason
+
+    @classmethod
+    def auto(cls,
+             fluid: Fluid,
+             geometry: Geometry,
+             cell_particles=None,
+             dense_fraction: float = 0.05):
+        dimensions = geometry.get_dimensions()
+        part_num_node = cls.OCTREE_PART_NUM_NODE[dimensions]
+        part_num_node_min = cls.OCTREE_PART_NUM_NODE_MIN[dimensions]
+
+        # Dense regions are predicted at the highest boundary density
+        if cell_particles is None:
+            estimator = Estimator(fluid=fluid, geometry=geometry)
+            cell_particles = estimator.cell_particles(estimator.cell_number_densities()[1])
+        cell_particles = np.asarray(cell_particles)
+
+        # The octree only pays off if enough cells hold more particles than one octree node
+        dense = float(np.mean(cell_particles > part_num_node))
+        if dense > dense_fraction:
+            reason = (f"octree, {dense:.0%} of the cells are predicted above {part_num_node} particles "
+                      f"(max {cell_particles.max():.0f})")
+            return cls(use_octree=True,
+                       use_nearest_neighbour=True,
+                       octree_part_num_node=part_num_node,
+                       octree_part_num_node_min=part_num_node_min,
+                       reason=reason)
+
+        reason = (f"nearest neighbour without octree, only {dense:.0%} of the cells are predicted above "
+                  f"{part_num_node} particles (max {cell_particles.max():.0f})")
+        return cls(use_octree=False, use_nearest_neighbour=True, reason=reason)
@@ -0,0 +1,103 @@
+import warnings
+
+import numpy as np
+import psutil
+
+from src.fluid.fluid import Fluid
+from src.geometry.geometry import Geometry
+from src.preflight.kinetics import boundary_number_densities, radial_weights
+
+
+class Estimator:
+
+    # Rough PICLAS costs, calibrate them with a measured run of a similar case
+    BYTES_PER_PARTICLE = 500
+    BYTES_PER_CELL = 20_000
+    BYTES_PER_RANK = 300e6
+    SECONDS_PER_PARTICLE_STEP = 2e-7
+
+    def __init__(self,
+                 fluid: Fluid,
+                 geometry: Geometry,
+                 ranks: int = 1,
+                 memory_per_node: float = None,
+                 memory_fraction: float = 0.8,
+                 min_particles_per_cell: float = 10):
+        self.__fluid = fluid
+        self.__geometry = geometry
+        self._ranks = ranks
+        self._memory_per_node = psutil.virtual_memory().total if memory_per_node is None else memory_per_node
+        self._memory_fraction = memory_fraction
+        self._min_particles_per_cell = min_particles_per_cell
+
+    def cell_number_densities(self):
+        # Without a flow solution the density lies between the lowest and the highest boundary density
+        densities = list(boundary_number_densities(self.__fluid).values())
+        if len(densities) == 0:
+            raise ValueError("The fluid has neither surface fluxes nor internal fluxes.")
+
+        number_of_cells = self.__geometry.get_number_of_cells()
+        low, high = min(densities), max(densities)
+        return np.full(number_of_cells, low), np.full(number_of_cells, high)
+
+    def cell_particle_weights(self):
+        # Real particles represented by one simulation particle in each cell
+        weights = np.full(self.__geometry.get_number_of_cells(), float(self.__fluid.macro_particle_factor))
+
+        part_scale_factor = self.__geometry.radial_weighting_options["Particles-RadialWeighting-PartScaleFactor"]
+        if self.__geometry.is_radial_weighting() == "T" and part_scale_factor is not None:
+            radii = self.__geometry.get_cell_centers()[:, 1]
+            weights *= radial_weights(radii, np.abs(radii).max(), part_scale_factor)
+
+        return weights
+
+    def cell_particles(self, number_densities=None):
+        if number_densities is None:
+            low, high = self.cell_number_densities()
+            number_densities = (low + high) / 2
+        return number_densities * self.__geometry.get_cell_volumes() / self.cell_particle_weights()
+
+    def estimate(self, simulation_time: float, time_step: float) -> dict:
+        low, high = self.cell_number_densities()
+        particles_low = self.cell_particles(low)
+        particles_high = self.cell_particles(high)
+        particles_mean = (particles_low + particles_high) / 2
+
+        number_of_cells = len(particles_mean)
+        iterations = int(round(simulation_time / time_step))
+
+        # Memory for the densest case: the whole domain at the highest boundary density
+        memory_per_rank = ((particles_high.sum() * self.BYTES_PER_PARTICLE + number_of_cells * self.BYTES_PER_CELL)
+                           / self._ranks + self.BYTES_PER_RANK)
+
+        return {
+            "cells": number_of_cells,
+            "iterations": iterations,
+            "particles": float(particles_mean.sum()),
+            "particles_max": float(particles_high.sum()),
+            "particles_per_cell_min": float(particles_low.min()),
+            "particles_per_cell_median": float(np.median(particles_mean)),
+            "particles_per_cell_max": float(particles_high.max()),
+            "memory_per_rank": float(memory_per_rank),
+            "memory_per_node": float(memory_per_rank * self._ranks),
+            "wall_time": float(particles_mean.sum() * iterations * self.SECONDS_PER_PARTICLE_STEP / self._ranks),
+        }
+
+    def check(self, simulation_time: float, time_step: float, strict: bool = False) -> dict:
+        estimate = self.estimate(simulation_time=simulation_time, time_step=time_step)
+
+        # Refuse cases that do not fit into the node memory
+        if estimate["memory_per_node"] > self._memory_fraction * self._memory_per_node:
+            raise ValueError(f"The case needs about {estimate['memory_per_node'] / 1e9:.1f} GB, "
+                             f"but only {self._memory_fraction * self._memory_per_node / 1e9:.1f} GB are available. "
+                             f"Increase the macro particle factor.")
+
+        # Too few particles per cell make the collision sampling meaningless
+        if estimate["particles_per_cell_min"] < self._min_particles_per_cell:
+            message = (f"Only {estimate['particles_per_cell_min']:.1f} particles in the emptiest cell "
+                       f"(at least {self._min_particles_per_cell} required). Decrease the macro particle factor.")
+            if strict:
+                raise ValueError(message)
+            warnings.warn(message)
+
+        return estimate
@@ -0,0 +1,46 @@
+import numpy as np
+
+BOLTZMANN_CONSTANT = 1.380649e-23
+
+
+def number_density(pressure, temperature):
+    return np.asarray(pressure) / (BOLTZMANN_CONSTANT * np.asarray(temperature))
+
+
+def boundary_number_densities(fluid) -> dict:
+    # Number densities of the surface fluxes (adaptive pressure) and the internal fluxes
+    densities = {}
+    for surface_flux in fluid.surface_fluxes:
+        densities[surface_flux["BC"]] = float(number_density(surface_flux["Adaptive-Pressure"],
+                                                             surface_flux["MWTemperatureIC"]))
+    for index, internal_flux in enumerate(fluid.internal_fluxes):
+        densities[f"Init{index + 1}"] = float(internal_flux["PartDensity"])
+
+    return densities
+
+
+def radial_weights(radii, r_max: float, part_scale_factor: float):
+    # PICLAS radial weighting: the particle weight grows linearly from 1 on the axis to the scale factor at r_max
+    return 1 + (part_scale_factor - 1) * np.abs(radii) / r_max
+
+
+def vhs_diameter(temperature, properties: dict):
+    # PICLAS stores omega as the VHS viscosity exponent minus 1/2
+    return properties["dref"] * (properties["Tref"] / np.asarray(temperature)) ** properties["omega"]
+
+
+def mean_free_path(number_density_, temperature, properties: dict):
+    return 1 / (np.sqrt(2) * np.pi * vhs_diameter(temperature, properties) ** 2 * np.asarray(number_density_))
+
+
+def mean_thermal_speed(temperature, mass: float):
+    return np.sqrt(8 * BOLTZMANN_CONSTANT * np.asarray(temperature) / (np.pi * mass))
+
+
+def most_probable_speed(temperature, mass: float):
+    return np.sqrt(2 * BOLTZMANN_CONSTANT * np.asarray(temperature) / mass)
+
+
+def mean_collision_time(number_density_, temperature, properties: dict):
+    return (mean_free_path(number_density_, temperature, properties)
+            / mean_thermal_speed(temperature, properties["MassIc"]))
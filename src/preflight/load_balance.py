@@ -0,0 +1,93 @@
+import numpy as np
+
+from src.fluid.fluid import Fluid
+from src.geometry.geometry import Geometry
+from src.preflight.estimator import Estimator
+from src.reader.dsmc_state import DSMCState
+
+
+class LoadBalance:
+
+    def __init__(self,
+                 do_load_balance: bool = False,
+                 mpi_weight: float = 1000,
+                 use_h5io_load_balance: bool = False,
+                 part_weight_load_balance: bool = True,
+                 do_initial_auto_restart: bool = False,
+                 initial_auto_restart_part_weight_load_balance: bool = False,
+                 load_balance_max_steps: int = 2):
+        self._options = {
+            "Particles-MPIWeight": mpi_weight,
+            "DoLoadBalance": "T" if do_load_balance else "F",
+            "UseH5IOLoadBalance": "T" if use_h5io_load_balance else "F",
+            "PartWeightLoadBalance": "T" if part_weight_load_balance else "F",
+            "DoInitialAutoRestart": "T" if do_initial_auto_restart else "F",
+            "InitialAutoRestart-PartWeightLoadBalance": "T" if initial_auto_restart_part_weight_load_balance else "F",
+            "LoadBalanceMaxSteps": load_balance_max_steps,
+        }
+        self._imbalance = None
+
+    @property
+    def options(self):
+        return self._options
+
+    @options.setter
+    def options(self, value):
+        self._options = value
+
+    @property
+    def imbalance(self):
+        return self._imbalance
+
+    @classmethod
+    def auto(cls,
+             fluid: Fluid,
+             geometry: Geometry,
+             ranks: int,
+             threshold: float = 1.2,
+             cell_particles=None):
+        # Pre-flight particles per cell, ordered along the space-filling curve that HOPR sorts the elements by
+        if cell_particles is None:
+            cell_particles = Estimator(fluid=fluid, geometry=geometry).cell_particles()
+            cell_particles = cell_particles[np.argsort(cls._morton_order(geometry.get_cell_centers()))]
+
+        return cls._from_cell_particles(cell_particles, ranks=ranks, threshold=threshold)
+
+    @classmethod
+    def from_dsmc_state(cls, h5_file: str, ranks: int, threshold: float = 1.2):
+        # The elements of a pilot run are already in the HOPR order
+        with DSMCState(h5_file) as state:
+            cell_particles = state["simulation_particles"]
+
+        return cls._from_cell_particles(cell_particles, ranks=ranks, threshold=threshold)
+
+    @staticmethod
+    def rank_imbalance(cell_particles, ranks: int) -> float:
+        # PICLAS splits the elements into contiguous blocks of equal element count, every element costs at least one
+        loads = np.array([block.sum() for block in np.array_split(np.asarray(cell_particles) + 1, ranks)])
+        return float(loads.max() / loads.mean())
+
+    @classmethod
+    def _from_cell_particles(cls, cell_particles, ranks: int, threshold: float):
+        imbalance = cls.rank_imbalance(cell_particles, ranks)
+        imbalanced = imbalance > threshold
+
+        load_balance = cls(do_load_balance=imbalanced,
+                           do_initial_auto_restart=imbalanced,
+                           initial_auto_restart_part_weight_load_balance=imbalanced)
+        load_balance._imbalance = imbalance
+
+        return load_balance
+
+    @staticmethod
+    def _morton_order(centers, bits: int = 16):
+        # Interleave the bits of the quantised x and y coordinates
+        minimum = centers[:, :2].min(axis=0)
+        extent = np.maximum(centers[:, :2].max(axis=0) - minimum, np.finfo(float).tiny)
+        quantised = ((centers[:, :2] - minimum) / extent * (2 ** bits - 1)).astype(np.uint64)
+
+        order = np.zeros(len(centers), dtype=np.uint64)
+        for bit in range(bits):
+            for axis in range(2):
+                order |= ((quantised[:, axis] >> np.uint64(bit)) & np.uint64(1)) << np.uint64(2 * bit + axis)
+        return order
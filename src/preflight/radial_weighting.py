@@ -0,0 +1,79 @@
+import numpy as np
+
+from src.fluid.fluid import Fluid
+from src.geometry.geometry2 import Geometry2
+from src.preflight.estimator import Estimator
+from src.preflight.kinetics import radial_weights
+from src.reader.dsmc_state import DSMCState
+
+
+class RadialWeightingTuner:
+
+    def __init__(self,
+                 radii,
+                 volumes,
+                 number_densities,
+                 macro_particle_factor: float):
+        self._radii = np.abs(np.asarray(radii, dtype=float))
+        self._volumes = np.asarray(volumes, dtype=float)
+        self._number_densities = np.asarray(number_densities, dtype=float)
+        self._macro_particle_factor = float(macro_particle_factor)
+        self._r_max = self._radii.max()
+
+    @classmethod
+    def from_geometry(cls, fluid: Fluid, geometry: Geometry2):
+        # Pre-flight density estimate: the mean of the lowest and the highest boundary density
+        low, high = Estimator(fluid=fluid, geometry=geometry).cell_number_densities()
+        return cls(radii=geometry.get_cell_centers()[:, 1],
+                   volumes=geometry.get_cell_volumes(),
+                   number_densities=(low + high) / 2,
+                   macro_particle_factor=fluid.macro_particle_factor)
+
+    @classmethod
+    def from_dsmc_state(cls, h5_file: str, macro_particle_factor: float):
+        with DSMCState(h5_file) as state:
+            number_densities = state["density"]
+            with state.mesh() as mesh:
+                radii = mesh.barycenters[:, 1]
+                volumes = mesh.revolved_volumes
+
+        return cls(radii=radii, volumes=volumes, number_densities=number_densities,
+                   macro_particle_factor=macro_particle_factor)
+
+    def particles_per_cell(self, part_scale_factor: float = 1):
+        weights = self._macro_particle_factor * radial_weights(self._radii, self._r_max, part_scale_factor)
+        return self._number_densities * self._volumes / weights
+
+    def spread(self, part_scale_factor: float = 1) -> float:
+        # Standard deviation of the logarithm of the particles per cell, zero for perfectly even cells
+        particles = self.particles_per_cell(part_scale_factor)
+        return float(np.log(particles[particles > 0]).std())
+
+    def tune(self, min_particles_per_cell: float = 10, factors=None) -> dict:
+        if factors is None:
+            factors = np.geomspace(1, 1e4, 401)
+
+        # Larger factors always even out the cells, but the emptiest cell must keep enough particles
+        spreads = np.array([self.spread(factor) if self.particles_per_cell(factor).min() >= min_particles_per_cell
+                            else np.inf for factor in factors])
+        part_scale_factor = float(factors[int(np.argmin(spreads))]) if np.isfinite(spreads).any() else 1.0
+
+        particles_before = self.particles_per_cell(1)
+        particles_after = self.particles_per_cell(part_scale_factor)
+
+        return {
+            "part_scale_factor": part_scale_factor,
+            "particles_before": float(particles_before.sum()),
+            "particles_after": float(particles_after.sum()),
+            "particle_reduction": float(particles_before.sum() / particles_after.sum()),
+            "spread_before": self.spread(1),
+            "spread_after": self.spread(part_scale_factor),
+            "particles_per_cell_min": float(particles_after.min()),
+            "particles_per_cell_max": float(particles_after.max()),
+        }
+
+    def apply(self, geometry: Geometry2, min_particles_per_cell: float = 10, factors=None) -> dict:
+        result = self.tune(min_particles_per_cell=min_particles_per_cell, factors=factors)
+        geometry.radial_weighting = True
+        geometry.radial_weighting_options["Particles-RadialWeighting-PartScaleFactor"] = result["part_scale_factor"]
+        return result
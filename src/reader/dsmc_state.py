@@ -0,0 +1,110 @@
+import os
+
+import h5py
+import numpy as np
+
+from src.reader.mesh import Mesh, _decode
+
+
+class DSMCState:
+
+    # Macroscopic fields of a DSMCState file. Multi-species runs write the Total_ values, single species runs
+    # only the Spec001_ values.
+    FIELDS = {
+        "density": ["NumberDensity"],
+        "velocity": ["VeloX", "VeloY", "VeloZ"],
+        "translational_temperature": ["TempTransMean"],
+        "translational_temperatures": ["TempTransX", "TempTransY", "TempTransZ"],
+        "rotational_temperature": ["TempRot"],
+        "vibrational_temperature": ["TempVib"],
+        "electronic_temperature": ["TempElec"],
+        "temperature": ["TempMean"],
+        "simulation_particles": ["SimPartNum"],
+        "max_collision_probability": ["DSMC_MaxCollProb"],
+        "mean_collision_probability": ["DSMC_MeanCollProb"],
+        "mean_collision_separation": ["DSMC_MCS_over_MFP"],
+    }
+
+    def __init__(self, h5_file: str):
+        self.h5_file = h5_file
+        self._file = h5py.File(h5_file, "r")
+        self._data = self._file["ElemData"]
+        # PICLAS writes the variable names on the file root like Time and MeshFile, older files on ElemData
+        attributes = self._file.attrs if "VarNamesAdd" in self._file.attrs else self._data.attrs
+        self._variable_names = [_decode(name) for name in attributes["VarNamesAdd"]]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getitem__(self, name: str):
+        return self.field(name)
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def variable_names(self):
+        return self._variable_names
+
+    @property
+    def number_of_elements(self) -> int:
+        return self._data.shape[0]
+
+    @property
+    def time(self) -> float:
+        return float(np.ravel(self._file.attrs["Time"])[0])
+
+    @property
+    def mesh_file(self) -> str:
+        # The mesh file is written relative to the case directory
+        mesh_file = _decode(np.ravel(self._file.attrs["MeshFile"])[0])
+        return os.path.join(os.path.dirname(os.path.abspath(self.h5_file)), mesh_file)
+
+    def mesh(self) -> Mesh:
+        return Mesh(self.mesh_file)
+
+    def read(self, elements: slice = slice(None)):
+        # All variables of the requested elements
+        return self._data[elements]
+
+    def variable(self, variable_name: str, elements: slice = slice(None)):
+        # Read a single column of ElemData, only the requested elements are loaded
+        if variable_name not in self._variable_names:
+            raise ValueError(f"Variable {variable_name} is not in {self.h5_file}.")
+        return self._data[elements, self._variable_names.index(variable_name)]
+
+    def field(self, name: str, elements: slice = slice(None)):
+        if name in self._variable_names:
+            return self.variable(name, elements)
+        if name not in self.FIELDS:
+            raise ValueError(f"Field {name} must be one of {list(self.FIELDS)} or a variable name of the file.")
+
+        components = [self.variable(self._resolve(variable_name), elements) for variable_name in self.FIELDS[name]]
+        if len(components) == 1:
+            return components[0]
+        return np.stack(components, axis=-1)
+
+    def fields(self, names: list = None, elements: slice = slice(None)):
+        if names is None:
+            names = [name for name in self.FIELDS if self.has_field(name)]
+        return {name: self.field(name, elements) for name in names}
+
+    def has_field(self, name: str) -> bool:
+        try:
+            [self._resolve(variable_name) for variable_name in self.FIELDS[name]]
+        except ValueError:
+            return False
+        return True
+
+    def chunks(self, chunk_size: int = 1_000_000):
+        for start in range(0, self.number_of_elements, chunk_size):
+            yield slice(start, min(start + chunk_size, self.number_of_elements))
+
+    def _resolve(self, variable_name: str) -> str:
+        for candidate in (variable_name, f"Total_{variable_name}", f"Spec001_{variable_name}"):
+            if candidate in self._variable_names:
+                return candidate
+        raise ValueError(f"Variable {variable_name} is not in {self.h5_file}.")
@@ -0,0 +1,191 @@
+import os
+
+import h5py
+import numpy as np
+
+from src.reader.mesh import Mesh, _decode
+from src.utility.catalog import catalog
+
+# Corners of the six local sides of a hexahedron in CGNS order, the normal of each side points out of the element
+SIDE_CORNERS = np.array([
+    [0, 3, 2, 1],
+    [0, 1, 5, 4],
+    [1, 2, 6, 5],
+    [2, 3, 7, 6],
+    [0, 4, 7, 3],
+    [4, 5, 6, 7],
+])
+
+
+def surface_sides(mesh: Mesh, boundary_names: list, axisymmetric: bool = False) -> dict:
+    # Surface sides are counted in SideInfo order, every global side once
+    element_info = mesh.element_info[()]
+    side_info = mesh.side_info[()]
+    mesh_boundary_names = mesh.boundary_names
+
+    boundary_ids = side_info[:, 4]
+    boundary_of_side = np.full(len(side_info), -1)
+    for index, name in enumerate(boundary_names):
+        if name in mesh_boundary_names:
+            boundary_of_side[boundary_ids == mesh_boundary_names.index(name) + 1] = index
+
+    sides = np.flatnonzero(boundary_of_side >= 0)
+    global_ids = np.abs(side_info[sides, 1])
+    _, first = np.unique(global_ids, return_index=True)
+    if np.any(global_ids > 0):
+        sides = sides[np.sort(first)]
+
+    # Element and local side of every surface side
+    elements = np.searchsorted(element_info[:, 3], sides, side="right")
+    local_sides = sides - element_info[elements, 2]
+
+    corners = mesh.element_corners()[elements[:, None], SIDE_CORNERS[local_sides], :]
+    normals = 0.5 * np.cross(corners[:, 2] - corners[:, 0], corners[:, 3] - corners[:, 1])
+    areas = np.linalg.norm(normals, axis=1)
+
+    if axisymmetric:
+        # The side is a line in the x-y plane revolved around the x axis, Pappus' theorem gives the area
+        xy = corners[:, :, :2]
+        lengths = np.linalg.norm(xy.max(axis=1) - xy.min(axis=1), axis=1)
+        areas = 2 * np.pi * np.abs(xy[:, :, 1]).mean(axis=1) * lengths
+
+    return {
+        "boundaries": boundary_of_side[sides],
+        "areas": areas,
+        "normals": normals / np.where(np.linalg.norm(normals, axis=1) > 0,
+                                      np.linalg.norm(normals, axis=1), 1)[:, None],
+    }
+
+
+class DSMCSurfState:
+
+    def __init__(self, h5_file: str, axisymmetric: bool = False, sides: dict = None):
+        self.h5_file = h5_file
+        self._file = h5py.File(h5_file, "r")
+        self._variable_names = [_decode(name) for name in self._file.attrs["VarNamesSurface"]]
+        self._boundary_names = [_decode(name) for name in np.ravel(self._file.attrs["BC_Surf"])]
+        self._axisymmetric = axisymmetric
+        self._sides = sides
+        self._data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def variable_names(self):
+        return self._variable_names
+
+    @property
+    def boundary_names(self):
+        return self._boundary_names
+
+    @property
+    def time(self) -> float:
+        return float(np.ravel(self._file.attrs["Time"])[0])
+
+    @property
+    def mesh_file(self) -> str:
+        # The mesh file is written relative to the case directory
+        mesh_file = _decode(np.ravel(self._file.attrs["MeshFile"])[0])
+        return os.path.join(os.path.dirname(os.path.abspath(self.h5_file)), mesh_file)
+
+    @property
+    def sides(self):
+        if self._sides is None:
+            with Mesh(self.mesh_file) as mesh:
+                self._sides = surface_sides(mesh, self._boundary_names, self._axisymmetric)
+        return self._sides
+
+    @property
+    def data(self):
+        # Values per surface side, averaged over the sub-sides of the surface sampling
+        if self._data is None:
+            data = self._file["SurfaceData"][()]
+            if data.shape[-1] != len(self._variable_names):
+                data = data.T
+            self._data = data.reshape(data.shape[0], -1, data.shape[-1]).mean(axis=1)
+        return self._data
+
+    def variable(self, variable_name: str):
+        if variable_name not in self._variable_names:
+            raise ValueError(f"Variable {variable_name} is not in {self.h5_file}.")
+        return self.data[:, self._variable_names.index(variable_name)]
+
+    def integrals(self, variable_names: list = None) -> dict:
+        # Area integral of every variable per boundary, all sides at once
+        if variable_names is None:
+            variable_names = self._variable_names
+        areas = self.sides["areas"]
+        return {name: self._per_boundary(self.variable(name) * areas) for name in variable_names}
+
+    def means(self, variable_names: list = None) -> dict:
+        # Area weighted mean of every variable per boundary
+        if variable_names is None:
+            variable_names = self._variable_names
+        return {name: self._mean_per_boundary(self.variable(name)) for name in variable_names}
+
+    def areas(self) -> dict:
+        return self._per_boundary(self.sides["areas"])
+
+    def forces(self) -> dict:
+        # Integrated force vector per boundary, summed over the species
+        components = [self._total("ForcePerArea" + axis) for axis in "XYZ"]
+        areas = self.sides["areas"]
+        return self._to_dict(np.stack([self._bincount(component * areas) for component in components], axis=-1))
+
+    def pressures(self) -> dict:
+        # Area weighted mean normal stress per boundary, positive for a push into the wall
+        force_per_area = np.stack([self._total("ForcePerArea" + axis) for axis in "XYZ"], axis=-1)
+        normal_stress = np.einsum("ij,ij->i", force_per_area, self.sides["normals"])
+        return self._mean_per_boundary(normal_stress)
+
+    def heat_fluxes(self) -> dict:
+        # Integrated heat transfer per boundary
+        return self._per_boundary(self._total("HeatFlux") * self.sides["areas"])
+
+    def impact_rates(self) -> dict:
+        # Integrated impact number per boundary and species
+        return {name: self._per_boundary(self.variable(name) * self.sides["areas"])
+                for name in self._variable_names if name.endswith("ImpactNumber")}
+
+    @classmethod
+    def time_series(cls, directory_path: str, method: str = "integrals", axisymmetric: bool = False):
+        # Apply a method to every DSMCSurfState file of the case, the surface sides are computed once
+        times, values = [], []
+        sides = None
+        for h5_file in catalog(directory_path).files("DSMCSurfState"):
+            with cls(f"{directory_path}/{h5_file}", axisymmetric=axisymmetric, sides=sides) as state:
+                times.append(state.time)
+                values.append(getattr(state, method)())
+                sides = state.sides
+        return np.array(times), values
+
+    def _total(self, variable_name: str):
+        # Sum over the species if the file has no total value
+        for candidate in (variable_name, f"Total_{variable_name}"):
+            if candidate in self._variable_names:
+                return self.variable(candidate)
+        species = [name for name in self._variable_names if name.endswith(f"_{variable_name}")]
+        if len(species) == 0:
+            raise ValueError(f"Variable {variable_name} is not in {self.h5_file}.")
+        return np.sum([self.variable(name) for name in species], axis=0)
+
+    def _bincount(self, weights):
+        return np.bincount(self.sides["boundaries"], weights=weights, minlength=len(self._boundary_names))
+
+    def _per_boundary(self, weights) -> dict:
+        return self._to_dict(self._bincount(weights))
+
+    def _mean_per_boundary(self, values) -> dict:
+        areas = self.sides["areas"]
+        area = self._bincount(areas)
+        return self._to_dict(self._bincount(values * areas) / np.where(area > 0, area, np.nan))
+
+    def _to_dict(self, values) -> dict:
+        return {boundary: values[index] for index, boundary in enumerate(self._boundary_names)}
@@ -0,0 +1,105 @@
+import h5py
+import numpy as np
+
+
+class Mesh:
+
+    def __init__(self, mesh_file: str):
+        self.mesh_file = mesh_file
+        self._file = h5py.File(mesh_file, "r")
+        self._barycenters = None
+        self._volumes = None
+        self._revolved_volumes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def ngeo(self) -> int:
+        return int(self._file.attrs["Ngeo"])
+
+    @property
+    def number_of_elements(self) -> int:
+        return int(self._file.attrs["nElems"])
+
+    @property
+    def element_info(self):
+        return self._file["ElemInfo"]
+
+    @property
+    def side_info(self):
+        return self._file["SideInfo"]
+
+    @property
+    def node_coords(self):
+        return self._file["NodeCoords"]
+
+    @property
+    def boundary_names(self):
+        return [_decode(name) for name in self._file["BCNames"][()]]
+
+    @property
+    def barycenters(self):
+        if self._barycenters is None:
+            if "ElemBarycenters" in self._file:
+                self._barycenters = self._file["ElemBarycenters"][()]
+            else:
+                self._barycenters = self.element_nodes().mean(axis=1)
+        return self._barycenters
+
+    @property
+    def volumes(self):
+        if self._volumes is None:
+            self._volumes = self._hexahedron_volumes(self.element_corners())
+        return self._volumes
+
+    @property
+    def revolved_volumes(self):
+        # Axisymmetric 2D meshes are extruded in z, the face area of the extrusion is revolved around the x axis
+        if self._revolved_volumes is None:
+            z = self.element_corners()[:, :, 2]
+            areas = self.volumes / (z.max(axis=1) - z.min(axis=1))
+            self._revolved_volumes = areas * 2 * np.pi * np.abs(self.barycenters[:, 1])
+        return self._revolved_volumes
+
+    def element_nodes(self, elements: slice = slice(None)):
+        # Nodes are stored element by element in tensor-product order, (Ngeo+1)^3 nodes per element
+        element_info = self.element_info[elements]
+        nodes_per_element = (self.ngeo + 1) ** 3
+        first_node, last_node = element_info[0, 4], element_info[-1, 5]
+        node_coords = self.node_coords[first_node:last_node]
+
+        return node_coords.reshape(-1, nodes_per_element, 3)
+
+    def element_corners(self, elements: slice = slice(None)):
+        # CGNS corner order: the four corners of the lower face, then the four corners of the upper face
+        n = self.ngeo + 1
+        corners = [i + j * n + k * n * n for k in (0, n - 1) for i, j in ((0, 0), (n - 1, 0), (n - 1, n - 1), (0, n - 1))]
+
+        return self.element_nodes(elements)[:, corners, :]
+
+    @staticmethod
+    def _hexahedron_volumes(corners):
+        # Split every hexahedron into six tetrahedra around the diagonal from corner 0 to corner 6
+        tetrahedra = ((1, 2), (2, 3), (3, 7), (7, 4), (4, 5), (5, 1))
+        origin = corners[:, 0, :]
+        diagonal = corners[:, 6, :] - origin
+
+        volumes = np.zeros(len(corners))
+        for a, b in tetrahedra:
+            volumes += np.einsum("ij,ij->i", corners[:, a, :] - origin,
+                                 np.cross(corners[:, b, :] - origin, diagonal))
+
+        return np.abs(volumes) / 6
+
+
+def _decode(value) -> str:
+    if isinstance(value, bytes):
+        value = value.decode()
+    return value.strip()
@@ -0,0 +1,209 @@
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import h5py
+import numpy as np
+
+from src.runner.monitor.monitor import Monitor
+from src.runner.parallel.parallel import Parallel
+from src.utility.catalog import catalog
+
+# Output types that are archived, the latest State file stays untouched for restarts
+ARCHIVED_KINDS = ("DSMCState", "DSMCSurfState", "State")
+
+# Datasets with a lossy float32 copy if downcasting is requested
+FIELD_DATASETS = ("ElemData", "SurfaceData")
+
+
+class Archiver(Monitor):
+
+    def __init__(self,
+                 directory_path: str,
+                 workers: int = None,
+                 compression_level: int = 4,
+                 float32: bool = False,
+                 keep_latest_state: bool = True):
+        self.directory_path = directory_path
+        self._compression_level = compression_level
+        self._float32 = float32
+        self._keep_latest_state = keep_latest_state
+
+        if workers is None:
+            self._workers = Parallel().physical_cores
+        else:
+            self._workers = workers
+
+        self._pool = None
+        self._futures = {}
+        self._sizes = {}
+        self._exit_code = 0
+
+    @property
+    def exit_code(self):
+        return self._exit_code
+
+    def archive(self, h5_files: list = None) -> int:
+        if h5_files is None:
+            h5_files = self._archivable_files()
+
+        for h5_file in h5_files:
+            self._submit(h5_file)
+
+        self._wait()
+        return self._exit_code
+
+    def update(self):
+        # PICLAS has finished writing a file once its size does not change between two updates
+        for h5_file in self._archivable_files():
+            if h5_file in self._futures:
+                continue
+
+            size = os.path.getsize(f"{self.directory_path}/{h5_file}")
+            if self._sizes.get(h5_file) == size:
+                self._submit(h5_file)
+            else:
+                self._sizes[h5_file] = size
+
+        return False
+
+    def finish(self):
+        # Archive the files that were written after the last update
+        for h5_file in self._archivable_files():
+            if h5_file not in self._futures:
+                self._submit(h5_file)
+
+        self._wait()
+
+    def _archivable_files(self):
+        files = []
+        for kind in ARCHIVED_KINDS:
+            kind_files = catalog(self.directory_path).files(kind)
+            if kind == "State" and self._keep_latest_state:
+                kind_files = kind_files[:-1]
+            files += kind_files
+        return files
+
+    def _submit(self, h5_file: str):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._workers)
+        # Restart files are only compressed losslessly
+        float32 = self._float32 and "_State_" not in h5_file
+        self._futures[h5_file] = self._pool.submit(repack, f"{self.directory_path}/{h5_file}",
+                                                   self._compression_level, float32)
+
+    def _wait(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+        exit_codes = []
+        for h5_file, future in self._futures.items():
+            try:
+                exit_codes.append(future.result())
+            except Exception as error:
+                # e.g. a truncated file, the failure shows up in the exit code
+                warnings.warn(f"Archiving {h5_file} failed: {error!r}")
+                exit_codes.append(1)
+        self._exit_code = next((exit_code for exit_code in exit_codes if exit_code != 0), 0)
+        self._futures = {}
+        self._sizes = {}
+
+
+def repack(h5_path: str, compression_level: int = 4, float32: bool = False) -> int:
+    # Runs in a worker process, rewrites the file with chunked and compressed datasets
+    if is_archived(h5_path):
+        return 0
+
+    temporary_path = f"{h5_path}.archive"
+    with h5py.File(h5_path, "r") as source, h5py.File(temporary_path, "w") as destination:
+        _copy_attributes(source, destination)
+        source.visititems(lambda name, item: _copy_item(name, item, destination, compression_level, float32))
+
+    if not _verify(h5_path, temporary_path, float32):
+        os.remove(temporary_path)
+        return 1
+
+    # Keep the times of the original so that up-to-date conversions are not redone
+    status = os.stat(h5_path)
+    os.chmod(temporary_path, status.st_mode)
+    os.replace(temporary_path, h5_path)
+    os.utime(h5_path, ns=(status.st_atime_ns, status.st_mtime_ns))
+    return 0
+
+
+def is_archived(h5_path: str) -> bool:
+    datasets = []
+    with h5py.File(h5_path, "r") as file:
+        file.visititems(lambda name, item: datasets.append(item.compression)
+                        if isinstance(item, h5py.Dataset) and _is_compressible(item) else None)
+    return len(datasets) > 0 and all(compression is not None for compression in datasets)
+
+
+def _is_compressible(dataset: h5py.Dataset) -> bool:
+    # Scalars cannot be chunked, variable length data does not compress
+    return dataset.ndim > 0 and dataset.size > 1 and dataset.dtype.kind in "biuf"
+
+
+def _copy_item(name: str, item, destination: h5py.File, compression_level: int, float32: bool):
+    if isinstance(item, h5py.Group):
+        _copy_attributes(item, destination.require_group(name))
+        return
+
+    dtype = item.dtype
+    if float32 and name in FIELD_DATASETS and dtype == np.float64:
+        dtype = np.dtype(np.float32)
+
+    if not _is_compressible(item):
+        dataset = destination.create_dataset(name, data=item[()].astype(dtype) if item.ndim > 0 else item[()])
+    else:
+        dataset = destination.create_dataset(name, shape=item.shape, dtype=dtype, chunks=True, shuffle=True,
+                                             compression="gzip", compression_opts=compression_level)
+        for block in _blocks(item):
+            dataset[block] = item[block].astype(dtype)
+    _copy_attributes(item, dataset)
+
+
+def _blocks(dataset: h5py.Dataset, block_size: int = 1 << 26):
+    # Slices of the first axis that fit into block_size bytes
+    row_size = max(1, dataset.dtype.itemsize * dataset.size // max(1, dataset.shape[0]))
+    rows = max(1, block_size // row_size)
+    for start in range(0, dataset.shape[0], rows):
+        yield slice(start, min(start + rows, dataset.shape[0]))
+
+
+def _copy_attributes(source, destination):
+    for key, value in source.attrs.items():
+        destination.attrs[key] = value
+
+
+def _verify(original_path: str, archived_path: str, float32: bool) -> bool:
+    # Every dataset and attribute has to come back bit for bit, downcast fields have to match their float32 values
+    with h5py.File(original_path, "r") as original, h5py.File(archived_path, "r") as archived:
+        names = []
+        original.visititems(lambda name, item: names.append(name))
+        for name in [""] + names:
+            original_item = original[name] if name else original
+            archived_item = archived.get(name) if name else archived
+            if archived_item is None or not _same_attributes(original_item, archived_item):
+                return False
+            if not isinstance(original_item, h5py.Dataset):
+                continue
+
+            if original_item.shape != archived_item.shape:
+                return False
+            blocks = _blocks(original_item) if original_item.ndim > 0 else [()]
+            for block in blocks:
+                expected = original_item[block]
+                if float32 and name in FIELD_DATASETS and expected.dtype == np.float64:
+                    expected = expected.astype(np.float32)
+                if not np.array_equal(expected, archived_item[block], equal_nan=expected.dtype.kind in "fc"):
+                    return False
+
+    return True
+
+
+def _same_attributes(original, archived) -> bool:
+    if set(original.attrs) != set(archived.attrs):
+        return False
+    return all(np.array_equal(original.attrs[key], archived.attrs[key]) for key in original.attrs)
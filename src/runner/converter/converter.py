@@ -0,0 +1,110 @@
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.runner.monitor.monitor import Monitor
+from src.runner.parallel.parallel import Parallel
+from src.utility.private_helpers import find_piclas2vtk_path
+from src.utility.utility import find_dsmc_state_files
+
+
+class Converter(Monitor):
+
+    def __init__(self,
+                 directory_path: str,
+                 workers: int = None,
+                 force: bool = False):
+        self.directory_path = directory_path
+        self._piclas2vtk = find_piclas2vtk_path()
+        self._force = force
+
+        if workers is None:
+            self._workers = Parallel().physical_cores
+        else:
+            self._workers = workers
+
+        self._pool = None
+        self._futures = {}
+        self._sizes = {}
+        self._log_lock = threading.Lock()
+        self._exit_code = 0
+
+    @property
+    def exit_code(self):
+        return self._exit_code
+
+    def convert(self, h5_files: list = None) -> int:
+        if h5_files is None:
+            h5_files = find_dsmc_state_files(self.directory_path)
+
+        for h5_file in h5_files:
+            self._submit(h5_file)
+
+        self._wait()
+        return self._exit_code
+
+    def update(self):
+        # PICLAS has finished writing a file once its size does not change between two updates
+        for h5_file in find_dsmc_state_files(self.directory_path):
+            if h5_file in self._futures:
+                continue
+
+            size = os.path.getsize(f"{self.directory_path}/{h5_file}")
+            if self._sizes.get(h5_file) == size:
+                self._submit(h5_file)
+            else:
+                self._sizes[h5_file] = size
+
+        return False
+
+    def finish(self):
+        # Convert the files that were written after the last update
+        for h5_file in find_dsmc_state_files(self.directory_path):
+            if h5_file not in self._futures:
+                self._submit(h5_file)
+
+        self._wait()
+
+    def _wait(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+        exit_codes = [future.result() for future in self._futures.values()]
+        self._exit_code = next((exit_code for exit_code in exit_codes if exit_code != 0), 0)
+        self._futures = {}
+        self._sizes = {}
+
+    def is_converted(self, h5_file: str) -> bool:
+        h5_path = f"{self.directory_path}/{h5_file}"
+        vtu_path = f"{self.directory_path}/{self._vtu_file(h5_file)}"
+
+        return os.path.exists(vtu_path) and os.path.getmtime(vtu_path) >= os.path.getmtime(h5_path)
+
+    def _submit(self, h5_file: str):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._workers)
+        self._futures[h5_file] = self._pool.submit(self._convert_file, h5_file)
+
+    def _convert_file(self, h5_file: str) -> int:
+        if not self._force and self.is_converted(h5_file):
+            return 0
+
+        result = subprocess.run([self._piclas2vtk, "parameter.ini", h5_file],
+                                cwd=self.directory_path,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT,
+                                text=True)
+
+        # The workers share one log file
+        with self._log_lock:
+            with open(f"{self.directory_path}/piclas2vtk.log", "a") as log:
+                log.write(f"# {h5_file}\n{result.stdout}")
+
+        return result.returncode
+
+    @staticmethod
+    def _vtu_file(h5_file: str) -> str:
+        # piclas2vtk writes <ProjectName>_visuDSMC_<time>.vtu for <ProjectName>_DSMCState_<time>.h5
+        return h5_file.replace("_DSMCState_", "_visuDSMC_")[:-len(".h5")] + ".vtu"
@@ -0,0 +1,259 @@
+import abc
+import os
+import signal
+import subprocess
+import sys
+import threading
+import warnings
+
+from src.runner.parallel.parallel import Parallel
+from src.utility.private_helpers import find_hopr_path, find_piclas2vtk_path, find_piclas_path
+
+
+# Abstract class for the backends that run the programs of a case
+class Executor:
+
+    @property
+    def is_local(self) -> bool:
+        return True
+
+    @abc.abstractmethod
+    def execute(self,
+                directory_path: str,
+                program: str,
+                log_file: str,
+                ranks: int = None,
+                cores: list = None,
+                monitors: list = None,
+                stage: str = None) -> int:
+        pass
+
+
+class LocalExecutor(Executor):
+
+    def __init__(self, poll_interval: float = 5.0):
+        self._poll_interval = poll_interval
+        self._parallel = None
+
+    def execute(self,
+                directory_path: str,
+                program: str,
+                log_file: str,
+                ranks: int = None,
+                cores: list = None,
+                monitors: list = None,
+                stage: str = None) -> int:
+        command = f"cd {directory_path} && {self._mpirun(ranks, cores)}{program}"
+
+        if not monitors:
+            # pipefail keeps the exit code of the program instead of the one of tee
+            return subprocess.call(f"set -o pipefail; {command} | tee {log_file}", shell=True, executable="/bin/bash")
+
+        # Stream the output line by line to the log file, the terminal and the monitors
+        process = subprocess.Popen(command, shell=True, executable="/bin/bash", start_new_session=True,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+        errors = []
+        reader = threading.Thread(target=self._read_output,
+                                  args=(process, f"{directory_path}/{log_file}", monitors, errors),
+                                  daemon=True)
+        reader.start()
+
+        # Update the monitors while the program is running, a monitor returning True stops the program
+        stopped = False
+        try:
+            while True:
+                try:
+                    process.wait(timeout=self._poll_interval)
+                    break
+                except subprocess.TimeoutExpired:
+                    if errors:
+                        raise errors[0]
+                    if any([monitor.update() for monitor in monitors]) and not stopped:
+                        # mpirun forwards SIGTERM to all ranks
+                        os.killpg(process.pid, signal.SIGTERM)
+                        stopped = True
+        except BaseException:
+            # The job runs in its own session, neither a failing monitor nor Ctrl-C may leave it running
+            self._terminate(process)
+            reader.join()
+            raise
+        reader.join()
+        if errors:
+            raise errors[0]
+
+        for monitor in monitors:
+            monitor.finish()
+
+        # A requested stop is not a failure
+        return 0 if stopped else process.returncode
+
+    def _mpirun(self, ranks: int, cores: list) -> str:
+        if ranks is None:
+            return ""
+
+        # Pin the ranks to the given cores so that concurrent jobs do not share cores (Open MPI options)
+        # The cores are OS cpu ids, the processing element list takes hwloc logical core ids
+        binding = ""
+        if cores is not None:
+            if self._parallel is None:
+                self._parallel = Parallel()
+            logical_ids = self._parallel.logical_core_ids(cores)
+            binding = f"--map-by pe-list={','.join(str(core) for core in logical_ids)}:ordered --bind-to core "
+        return f"mpirun -np {ranks} {binding}"
+
+    @staticmethod
+    def _terminate(process: subprocess.Popen, timeout: float = 30.0):
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait(timeout=timeout)
+        except ProcessLookupError:
+            return
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+
+    @staticmethod
+    def _read_output(process: subprocess.Popen, log_path: str, monitors: list, errors: list):
+        # The pipe is drained even if a monitor fails, otherwise PICLAS blocks on a full output buffer
+        with open(log_path, "w") as log:
+            for line in process.stdout:
+                log.write(line)
+                sys.stdout.write(line)
+                if errors:
+                    continue
+                try:
+                    for monitor in monitors:
+                        monitor.read_line(line)
+                except Exception as error:
+                    errors.append(error)
+
+
+class HostfileExecutor(LocalExecutor):
+
+    def __init__(self,
+                 hostfile: str,
+                 mpirun_options: str = "--map-by node",
+                 poll_interval: float = 5.0):
+        super().__init__(poll_interval=poll_interval)
+        self.hostfile = os.path.abspath(hostfile)
+        self._mpirun_options = mpirun_options
+
+    def _mpirun(self, ranks: int, cores: list) -> str:
+        if ranks is None:
+            return ""
+
+        # Core sets of this machine mean nothing on the other nodes
+        return f"mpirun -np {ranks} --hostfile {self.hostfile} {self._mpirun_options} "
+
+
+class BatchExecutor(Executor):
+
+    def __init__(self,
+                 submit_command: str = "sbatch",
+                 options: list = None,
+                 mpirun: str = "mpirun"):
+        self._submit_command = submit_command
+        self._options = [] if options is None else options
+        self._mpirun = mpirun
+        self._last_jobs = {}
+
+    @property
+    def is_local(self) -> bool:
+        return False
+
+    @property
+    def last_jobs(self):
+        return self._last_jobs
+
+    def execute(self,
+                directory_path: str,
+                program: str,
+                log_file: str,
+                ranks: int = None,
+                cores: list = None,
+                monitors: list = None,
+                stage: str = None) -> int:
+        if monitors:
+            warnings.warn("Monitors are not supported by the batch executor, the job runs on another node.")
+
+        # Every stage of a case waits for the previous stage of the same case
+        directory_path = os.path.abspath(directory_path)
+        stage = "job" if stage is None else stage
+        mpirun = "" if ranks is None else f"{self._mpirun} -np {ranks} "
+        script = f"{directory_path}/{stage}.sbatch"
+        with open(script, "w") as file:
+            file.write(self._header(stage, 1 if ranks is None else ranks, f"{directory_path}/{log_file}"))
+            file.write(f"cd {directory_path}\n{mpirun}{program}\n")
+
+        job_id = self._submit(script, dependency=self._last_jobs.get(directory_path), dependency_type="afterok")
+        if job_id is None:
+            return 1
+        self._last_jobs[directory_path] = job_id
+        return 0
+
+    def write_sweep(self,
+                    case_directories: list,
+                    ranks: int,
+                    script_directory: str = ".",
+                    HOPR: bool = True,
+                    PICLAS2VTK: bool = True) -> list:
+        # One job array script per stage, the array index selects the case directory
+        case_directories = [os.path.abspath(directory) for directory in case_directories]
+        cases = " ".join(f'"{directory}"' for directory in case_directories)
+        stages = []
+        if HOPR:
+            stages.append(("hopr", 1, f"{find_hopr_path()} hopr.ini"))
+        stages.append(("piclas", ranks, f"{self._mpirun} -np {ranks} {find_piclas_path()} parameter.ini"))
+        if PICLAS2VTK:
+            stages.append(("piclas2vtk", 1,
+                           f'for h5_file in *_DSMCState_*.h5; do {find_piclas2vtk_path()} parameter.ini "$h5_file"; done'))
+
+        os.makedirs(script_directory, exist_ok=True)
+        scripts = []
+        for stage, stage_ranks, command in stages:
+            script = f"{os.path.abspath(script_directory)}/{stage}_array.sbatch"
+            with open(script, "w") as file:
+                file.write(self._header(stage, stage_ranks, f"{stage}_%a.log"))
+                file.write(f"#SBATCH --array=0-{len(case_directories) - 1}\n\n")
+                file.write(f"cases=({cases})\n")
+                file.write(f'cd "${{cases[$SLURM_ARRAY_TASK_ID]}}"\n{command}\n')
+            scripts.append(script)
+
+        return scripts
+
+    def submit_sweep(self,
+                     case_directories: list,
+                     ranks: int,
+                     script_directory: str = ".",
+                     HOPR: bool = True,
+                     PICLAS2VTK: bool = True) -> dict:
+        # Element i of a stage waits only for element i of the previous stage
+        job_ids = {}
+        previous_job = None
+        for script in self.write_sweep(case_directories, ranks, script_directory, HOPR, PICLAS2VTK):
+            previous_job = self._submit(script, dependency=previous_job, dependency_type="aftercorr")
+            if previous_job is None:
+                raise RuntimeError(f"Submitting {script} with {self._submit_command} failed.")
+            job_ids[os.path.basename(script).split("_array")[0]] = previous_job
+
+        return job_ids
+
+    def _header(self, stage: str, ranks: int, log_file: str) -> str:
+        header = f"#!/bin/bash\n#SBATCH --job-name={stage}\n#SBATCH --ntasks={ranks}\n#SBATCH --output={log_file}\n"
+        for option in self._options:
+            header += f"#SBATCH {option}\n"
+        return header
+
+    def _submit(self, script: str, dependency: str = None, dependency_type: str = "afterok"):
+        command = [self._submit_command, "--parsable"]
+        if dependency is not None:
+            command.append(f"--dependency={dependency_type}:{dependency}")
+        command.append(script)
+
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        if result.returncode != 0:
+            warnings.warn(f"Submitting {script} with {self._submit_command} failed: {result.stdout.strip()}")
+            return None
+
+        # --parsable prints "<job id>" or "<job id>;<cluster>"
+        return result.stdout.strip().split(";")[0]
@@ -0,0 +1,15 @@
+import abc
+
+
+# Abstract class for everything that follows a running PICLAS job
+class Monitor:
+
+    def read_line(self, line: str):
+        pass
+
+    @abc.abstractmethod
+    def update(self):
+        pass
+
+    def finish(self):
+        pass
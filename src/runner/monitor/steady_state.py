@@ -0,0 +1,153 @@
+import csv
+import os
+
+import numpy as np
+
+from src.runner.monitor.monitor import Monitor
+from src.utility.catalog import catalog
+
+
+class SteadyStateMonitor(Monitor):
+
+    def __init__(self,
+                 directory_path: str,
+                 column: str = None,
+                 window: int = 20,
+                 tolerance: float = 0.01,
+                 z_score: float = 2.0,
+                 patience: int = 3,
+                 sampling_duration: float = None):
+
+        if window < 4:
+            raise ValueError("The window must contain at least 4 samples.")
+
+        self.directory_path = directory_path
+        self._column = column
+        self._window = window
+        self._tolerance = tolerance
+        self._z_score = z_score
+        self._patience = patience
+        self._sampling_duration = sampling_duration
+
+        self._offset = 0
+        self._header = None
+        self._column_index = None
+        self._times = []
+        self._values = []
+        self._steady_checks = 0
+        self._steady_time = None
+        self._state_sizes = {}
+        self._state_file = None
+        self._state_time = None
+        self._old_state_files = set(self._state_files())
+
+    @property
+    def steady_time(self):
+        return self._steady_time
+
+    @property
+    def state_file(self):
+        return self._state_file
+
+    @property
+    def state_time(self):
+        return self._state_time
+
+    @property
+    def stopped(self) -> bool:
+        return self._state_file is not None
+
+    @property
+    def sampling_duration(self):
+        return self._sampling_duration
+
+    @property
+    def times(self):
+        return self._times
+
+    @property
+    def values(self):
+        return self._values
+
+    def update(self):
+        if self._steady_time is None:
+            self._read_part_analyze()
+            if self.is_steady():
+                self._steady_checks += 1
+            else:
+                self._steady_checks = 0
+            if self._steady_checks >= self._patience:
+                self._steady_time = self._times[-1]
+
+        if self._steady_time is not None:
+            # Stop at the first state file written after the flow became steady
+            return self._find_next_state_file()
+
+        return False
+
+    def is_steady(self) -> bool:
+        if len(self._values) < self._window:
+            return False
+
+        # Compare the two halves of the window: the drift must be within the noise or below the tolerance
+        values = np.array(self._values[-self._window:])
+        first, second = values[:self._window // 2], values[self._window // 2:]
+        drift = abs(second.mean() - first.mean())
+        noise = np.sqrt(first.var(ddof=1) / len(first) + second.var(ddof=1) / len(second))
+
+        return drift <= max(self._z_score * noise, self._tolerance * abs(values.mean()))
+
+    def _read_part_analyze(self):
+        part_analyze = f"{self.directory_path}/PartAnalyze.csv"
+        if not os.path.exists(part_analyze):
+            return
+
+        # Only read the lines that were appended since the last update
+        with open(part_analyze, "rb") as file:
+            file.seek(self._offset)
+            lines = file.readlines()
+            if lines and not lines[-1].endswith(b"\n"):
+                lines = lines[:-1]
+            self._offset += sum(len(line) for line in lines)
+
+        for row in csv.reader(line.decode() for line in lines):
+            if self._header is None:
+                self._header = [name.strip() for name in row]
+                self._column_index = self._find_column()
+                continue
+            try:
+                self._times.append(float(row[0]))
+                self._values.append(float(row[self._column_index]))
+            except (ValueError, IndexError):
+                continue
+
+    def _find_column(self) -> int:
+        if self._column is not None:
+            return self._header.index(self._column)
+
+        # Default to the number of simulation particles
+        for index, name in enumerate(self._header):
+            if "npart" in name.lower():
+                return index
+        raise ValueError(f"No particle count column in {self.directory_path}/PartAnalyze.csv.")
+
+    def _find_next_state_file(self) -> bool:
+        for state_file in self._state_files():
+            if state_file in self._old_state_files:
+                continue
+            time = float(state_file.split('_State_')[-1].split('.h5')[0])
+            if time < self._steady_time:
+                continue
+
+            # PICLAS has finished writing the file once its size does not change between two updates
+            size = os.path.getsize(f"{self.directory_path}/{state_file}")
+            if self._state_sizes.get(state_file) == size:
+                self._state_file = state_file
+                self._state_time = time
+                return True
+            self._state_sizes[state_file] = size
+
+        return False
+
+    def _state_files(self):
+        return catalog(self.directory_path).files("State")
@@ -0,0 +1,130 @@
+import json
+import os
+import re
+import threading
+import time
+
+from src.runner.monitor.monitor import Monitor
+
+
+class Telemetry(Monitor):
+
+    # Lines of the PICLAS output written every IterDisplayStep
+    PATTERNS = {
+        "iteration": re.compile(r"#Timesteps\s*:\s*([-+0-9.Ee]+)"),
+        "time_step": re.compile(r"(?<!#)Timestep\s*:\s*([-+0-9.Ee]+)"),
+        "time": re.compile(r"Sim time\s*:\s*([-+0-9.Ee]+)"),
+        "particles": re.compile(r"#Particles\s*:\s*([-+0-9.Ee]+)"),
+    }
+
+    def __init__(self,
+                 directory_path: str,
+                 ranks: int = 1,
+                 end_time: float = None,
+                 callback=None,
+                 status_file: str = "piclas_status.json",
+                 interval: float = 10.0):
+        self.directory_path = directory_path
+        self._ranks = ranks
+        self._end_time = end_time
+        self._callback = callback
+        self._status_file = status_file
+        self._interval = interval
+
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._last_write = None
+        self._current = {}
+        self._previous_sample = None
+        self._metrics = {"finished": False}
+
+    @property
+    def metrics(self):
+        with self._lock:
+            return dict(self._metrics)
+
+    def read_line(self, line: str):
+        for name, pattern in self.PATTERNS.items():
+            match = pattern.search(line)
+            if match is None:
+                continue
+            try:
+                self._current[name] = float(match.group(1))
+            except ValueError:
+                continue
+
+            # A new sample is complete with the simulation time
+            if name == "time":
+                self._sample()
+
+    def update(self):
+        now = time.perf_counter()
+        if self._last_write is None or now - self._last_write >= self._interval:
+            self._write()
+            self._last_write = now
+        return False
+
+    def finish(self):
+        with self._lock:
+            self._metrics["finished"] = True
+            self._metrics["wall_time"] = time.perf_counter() - self._start
+        self._write()
+
+    def _sample(self):
+        # parameter.ini may be written after the telemetry is created
+        if self._end_time is None:
+            self._end_time = self._read_end_time()
+
+        now = time.perf_counter()
+        sample = (now, self._current.get("iteration"), self._current["time"])
+
+        metrics = {
+            "finished": False,
+            "wall_time": now - self._start,
+            "iteration": self._current.get("iteration"),
+            "time": self._current["time"],
+            "time_step": self._current.get("time_step"),
+            "particles": self._current.get("particles"),
+            "end_time": self._end_time,
+        }
+
+        if self._current.get("particles") is not None:
+            metrics["particles_per_rank"] = self._current["particles"] / self._ranks
+        if self._end_time:
+            metrics["progress"] = self._current["time"] / self._end_time
+
+        # Rates between the last two samples
+        if self._previous_sample is not None:
+            wall_time = now - self._previous_sample[0]
+            if wall_time > 0:
+                if sample[1] is not None and self._previous_sample[1] is not None:
+                    metrics["iterations_per_second"] = (sample[1] - self._previous_sample[1]) / wall_time
+                simulated_time_per_second = (sample[2] - self._previous_sample[2]) / wall_time
+                metrics["simulated_time_per_second"] = simulated_time_per_second
+                if self._end_time and simulated_time_per_second > 0:
+                    metrics["estimated_time_left"] = (self._end_time - sample[2]) / simulated_time_per_second
+        self._previous_sample = sample
+
+        with self._lock:
+            self._metrics = metrics
+
+        if self._callback is not None:
+            self._callback(dict(metrics))
+
+    def _write(self):
+        status_path = os.path.join(self.directory_path, self._status_file)
+        temporary_path = f"{status_path}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(self.metrics, file, indent=2)
+        os.replace(temporary_path, status_path)
+
+    def _read_end_time(self):
+        parameter_ini = f"{self.directory_path}/parameter.ini"
+        if not os.path.exists(parameter_ini):
+            return None
+
+        with open(parameter_ini) as file:
+            for line in file:
+                if line.strip().startswith("Tend="):
+                    return float(line.split("=")[1].split("!")[0])
+        return None
@@ -0,0 +1,155 @@
+import json
+import os
+import shutil
+import time
+
+from src.reader.mesh import Mesh
+from src.runner.monitor.telemetry import Telemetry
+from src.runner.parallel.parallel import Parallel
+from src.utility.cache import hash_files
+from src.utility.catalog import catalog
+from src.utility.utility import clone_file
+
+
+class Autotuner:
+
+    def __init__(self,
+                 database_file: str = None,
+                 iterations: int = 200,
+                 similarity: float = 2.0):
+        if database_file is None:
+            database_file = os.path.expanduser("~/.cache/atlas/autotune.json")
+        os.makedirs(os.path.dirname(database_file), exist_ok=True)
+
+        self.database_file = database_file
+        self._iterations = iterations
+        self._similarity = similarity
+
+    def benchmark(self, directory_path: str, rank_counts: list = None) -> dict:
+        if rank_counts is None:
+            physical_cores = Parallel().physical_cores
+            rank_counts = sorted({2 ** i for i in range(physical_cores.bit_length()) if 2 ** i <= physical_cores}
+                                 | {physical_cores})
+
+        mesh_file = f"{directory_path}/{self._read_parameter(directory_path, 'MeshFile')}"
+        with Mesh(mesh_file) as mesh:
+            number_of_elements = mesh.number_of_elements
+
+        # A rank count whose run failed is recorded as None and never chosen
+        results = {ranks: self._run_benchmark(directory_path, mesh_file, ranks) for ranks in rank_counts}
+        rates = {ranks: rate for ranks, rate in results.items() if rate is not None}
+        if len(rates) == 0:
+            raise RuntimeError(f"PICLAS failed for every rank count in {directory_path}.")
+
+        best_ranks = max(rates, key=rates.get)
+        database = self._load()
+        database[hash_files([mesh_file])] = {
+            "elements": number_of_elements,
+            "results": {str(ranks): rate for ranks, rate in results.items()},
+            "best_ranks": best_ranks,
+            "elements_per_rank": number_of_elements / best_ranks,
+        }
+        self._save(database)
+
+        return results
+
+    def best_ranks(self, mesh_file: str, max_ranks: int = None):
+        if max_ranks is None:
+            max_ranks = Parallel().physical_cores
+
+        database = self._load()
+        if len(database) == 0 or not os.path.exists(mesh_file):
+            return None
+
+        # The same mesh was benchmarked before
+        fingerprint = hash_files([mesh_file])
+        if fingerprint in database:
+            return min(database[fingerprint]["best_ranks"], max_ranks)
+
+        # Otherwise use the best elements per rank of the benchmarked mesh with the closest element count
+        with Mesh(mesh_file) as mesh:
+            number_of_elements = mesh.number_of_elements
+        closest = min(database.values(), key=lambda entry: abs(entry["elements"] - number_of_elements))
+        ratio = number_of_elements / closest["elements"]
+        if ratio > self._similarity or ratio < 1 / self._similarity:
+            return None
+
+        return max(1, min(max_ranks, round(number_of_elements / closest["elements_per_rank"])))
+
+    def _run_benchmark(self, directory_path: str, mesh_file: str, ranks: int):
+        # Imported here because the Runner asks the autotuner for its rank count
+        from src.runner.runner import Runner
+
+        benchmark_directory = f"{directory_path}/autotune_{ranks}"
+        os.makedirs(benchmark_directory, exist_ok=True)
+        clone_file(mesh_file, f"{benchmark_directory}/{os.path.basename(mesh_file)}")
+
+        # Restart from the latest state if there is one, the particle count of a fresh start is not representative
+        state_file = self._latest_state_file(directory_path)
+        start_time = 0
+        if state_file is not None:
+            clone_file(f"{directory_path}/{state_file}", f"{benchmark_directory}/{state_file}")
+            start_time = float(state_file.split('_State_')[-1].split('.h5')[0])
+        self._write_benchmark_parameter_ini(directory_path, benchmark_directory, start_time)
+
+        telemetry = Telemetry(directory_path=benchmark_directory, ranks=ranks, interval=3600)
+        runner = Runner(directory_path=benchmark_directory, parallel=ranks)
+        start = time.perf_counter()
+        if state_file is None:
+            exit_code = runner.run(PICLAS=True, monitors=[telemetry])
+        else:
+            exit_code = runner.rerun(h5_file=state_file, monitors=[telemetry])
+        wall_time = time.perf_counter() - start
+
+        # The directory of a failed run is kept for its log
+        if exit_code != 0:
+            return None
+        shutil.rmtree(benchmark_directory)
+
+        # The rate between the last outputs excludes the start-up of PICLAS
+        return telemetry.metrics.get("iterations_per_second", self._iterations / wall_time)
+
+    def _write_benchmark_parameter_ini(self, directory_path: str, benchmark_directory: str, start_time: float):
+        time_step = float(self._read_parameter(directory_path, "ManualTimeStep"))
+        end_time = start_time + self._iterations * time_step
+        overrides = {
+            "Tend": end_time,
+            "IterDisplayStep": max(1, self._iterations // 10),
+            "Part-AnalyzeStep": self._iterations,
+            "Analyze_dt": end_time,
+            "Part-TimeFracForSampling": 0,
+            "Particles-NumberForDSMCOutputs": 0,
+        }
+
+        with open(f"{directory_path}/parameter.ini") as source, \
+                open(f"{benchmark_directory}/parameter.ini", "w") as destination:
+            for line in source:
+                key = line.split("=")[0].strip()
+                if key in overrides:
+                    line = f"{key}={overrides[key]}\n"
+                destination.write(line)
+
+    @staticmethod
+    def _read_parameter(directory_path: str, key: str) -> str:
+        with open(f"{directory_path}/parameter.ini") as file:
+            for line in file:
+                if line.split("=")[0].strip() == key:
+                    return line.split("=", 1)[1].split("!")[0].strip()
+        raise ValueError(f"{key} is not set in {directory_path}/parameter.ini.")
+
+    @staticmethod
+    def _latest_state_file(directory_path: str):
+        latest = catalog(directory_path).latest("State")
+        return None if latest is None else latest[1]
+
+    def _load(self):
+        if not os.path.exists(self.database_file):
+            return {}
+        with open(self.database_file) as file:
+            return json.load(file)
+
+    def _save(self, database: dict):
+        temporary_file = f"{self.database_file}.{os.getpid()}"
+        with open(temporary_file, "w") as file:
+            json.dump(database, file, indent=2)
+        os.replace(temporary_file, self.database_file)
@@ -1,3 +1,6 @@
+import glob
+import os
+
 import psutil
 
 
@@ -5,6 +8,7 @@ class Parallel:
     def __init__(self):
         self.__physical_cores = psutil.cpu_count(logical=False)
         self.__logical_cores = psutil.cpu_count(logical=True)
+        self.__topology = None
 
     @property
     def logical_cores(self):
@@ -13,3 +17,124 @@ class Parallel:
     @property
     def physical_cores(self):
         return self.__physical_cores
+
+    @property
+    def topology(self):
+        if self.__topology is None:
+            self.__topology = self._read_topology()
+        return self.__topology
+
+    def core_cpus(self):
+        # One logical cpu per physical core, ordered by NUMA node, socket and core
+        cores = {}
+        for cpu in self.topology:
+            cores.setdefault((cpu["numa"], cpu["socket"], cpu["core"]), cpu["cpu"])
+        return [cores[key] for key in sorted(cores)]
+
+    def logical_core_ids(self, cpus: list):
+        # hwloc numbers the cores package by package in the order of their first cpu, Open MPI binds by these numbers
+        first_cpu_of_socket, first_cpu_of_core = {}, {}
+        for cpu in self.topology:
+            first_cpu_of_socket.setdefault(cpu["socket"], cpu["cpu"])
+            first_cpu_of_core.setdefault((cpu["socket"], cpu["core"]), cpu["cpu"])
+        cores = sorted(first_cpu_of_core, key=lambda core: (first_cpu_of_socket[core[0]], first_cpu_of_core[core]))
+        logical_ids = {core: index for index, core in enumerate(cores)}
+
+        core_of_cpu = {cpu["cpu"]: (cpu["socket"], cpu["core"]) for cpu in self.topology}
+        for cpu in cpus:
+            if cpu not in core_of_cpu:
+                raise ValueError(f"The cpu {cpu} is not available to this process.")
+        return [logical_ids[core_of_cpu[cpu]] for cpu in cpus]
+
+    def numa_nodes(self):
+        nodes = {}
+        for cpu in self.core_cpus():
+            numa = next(entry["numa"] for entry in self.topology if entry["cpu"] == cpu)
+            nodes.setdefault(numa, []).append(cpu)
+        return nodes
+
+    def _read_topology(self):
+        # Logical cpus this process may run on
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(
+            range(self.__logical_cores))
+
+        numa_of_cpu = {}
+        for node_directory in glob.glob("/sys/devices/system/node/node[0-9]*"):
+            numa = int(node_directory.split("node")[-1])
+            for cpu in self._parse_cpu_list(self._read(f"{node_directory}/cpulist", "")):
+                numa_of_cpu[cpu] = numa
+
+        topology = []
+        for cpu in cpus:
+            cpu_directory = f"/sys/devices/system/cpu/cpu{cpu}/topology"
+            topology.append({
+                "cpu": cpu,
+                "core": int(self._read(f"{cpu_directory}/core_id", cpu)),
+                "socket": int(self._read(f"{cpu_directory}/physical_package_id", 0)),
+                "numa": numa_of_cpu.get(cpu, 0),
+            })
+        return topology
+
+    @staticmethod
+    def _read(path: str, default):
+        try:
+            with open(path) as file:
+                return file.read().strip()
+        except OSError:
+            return default
+
+    @staticmethod
+    def _parse_cpu_list(cpu_list: str):
+        # Kernel cpu lists look like "0-3,8-11"
+        cpus = []
+        for part in cpu_list.split(","):
+            if "-" in part:
+                start, end = part.split("-")
+                cpus.extend(range(int(start), int(end) + 1))
+            elif part:
+                cpus.append(int(part))
+        return cpus
+
+
+class CoreAllocator:
+
+    def __init__(self, parallel: Parallel = None, total_cores: int = None):
+        if parallel is None:
+            parallel = Parallel()
+
+        # Free cores per NUMA node, limited to total_cores
+        self._free = {}
+        cores = parallel.core_cpus()
+        if total_cores is not None:
+            cores = cores[:total_cores]
+        for numa, cpus in parallel.numa_nodes().items():
+            self._free[numa] = [cpu for cpu in cpus if cpu in cores]
+        self._numa_of_cpu = {entry["cpu"]: entry["numa"] for entry in parallel.topology}
+
+    @property
+    def free_cores(self) -> int:
+        return sum(len(cpus) for cpus in self._free.values())
+
+    def allocate(self, number_of_cores: int):
+        if number_of_cores > self.free_cores:
+            return None
+
+        # Best fit into a single NUMA node, otherwise spread over the nodes with the most free cores
+        fitting = [numa for numa, cpus in self._free.items() if len(cpus) >= number_of_cores]
+        if fitting:
+            numa = min(fitting, key=lambda node: len(self._free[node]))
+            cpus, self._free[numa] = self._free[numa][:number_of_cores], self._free[numa][number_of_cores:]
+            return cpus
+
+        cpus = []
+        for numa in sorted(self._free, key=lambda node: -len(self._free[node])):
+            taken = self._free[numa][:number_of_cores - len(cpus)]
+            self._free[numa] = self._free[numa][len(taken):]
+            cpus += taken
+        return cpus
+
+    def release(self, cpus: list):
+        for cpu in cpus:
+            self._free[self._numa_of_cpu[cpu]].append(cpu)
+        for numa in self._free:
+            self._free[numa].sort()
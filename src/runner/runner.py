@@ -1,58 +1,120 @@
-import os
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
+from src.runner.converter.converter import Converter
+from src.runner.executor.executor import Executor, LocalExecutor
 from src.runner.parallel.parallel import Parallel
+from src.utility.catalog import catalog
 from src.utility.private_helpers import find_gmsh_path, find_hopr_path, find_piclas_path, find_piclas2vtk_path
+from src.utility.utility import find_dsmc_state_files
 
 
 class Runner:
 
     def __init__(self,
                  directory_path: str,
-                 parallel: int = None):
+                 parallel: int or str = None,
+                 poll_interval: float = 5.0,
+                 cores: list = None,
+                 executor: Executor = None):
         self.directory_path = directory_path
         self._gmsh = find_gmsh_path()
         self._hopr = find_hopr_path()
         self._piclas = find_piclas_path()
         self._piclas2vtk = find_piclas2vtk_path()
+        self._pool = None
+        self._cores = cores
+        self._executor = LocalExecutor(poll_interval=poll_interval) if executor is None else executor
 
         if parallel is None:
             self._parallel = Parallel().physical_cores
         else:
             self._parallel = parallel
 
+    @property
+    def parallel(self):
+        # "auto" is resolved once the mesh of the case exists
+        if self._parallel == "auto":
+            return self._autotuned_parallel()
+        return self._parallel
+
+    @property
+    def executor(self):
+        return self._executor
+
     def run(self,
             HOPR: bool = False,
             PICLAS: bool = False,
-            PICLAS2VTK: bool = False):
+            PICLAS2VTK: bool = False,
+            workers: int = None,
+            watch: bool = False,
+            monitors: list = None) -> int:
+
+        # Keep the first non-zero exit code of the programs
+        exit_codes = [0]
 
         if HOPR:
             # Run HOPR
-            subprocess.call(f"cd {self.directory_path} && {self._hopr} hopr.ini | tee hopr.log", shell=True)
+            exit_codes.append(self._executor.execute(self.directory_path, f"{self._hopr} hopr.ini",
+                                                     log_file="hopr.log", stage="hopr"))
+
+        # Convert the DSMCState files in parallel, skipping the ones that are already up-to-date
+        converter = None
+        if PICLAS2VTK and self._executor.is_local:
+            converter = Converter(directory_path=self.directory_path, workers=workers)
 
         if PICLAS:
-            # Run PICLAS
-            subprocess.call(
-                f"cd {self.directory_path} && mpirun -np {self._parallel}  {self._piclas} parameter.ini | tee piclas.log",
-                shell=True)
-        if PICLAS2VTK:
+            # Run PICLAS, converting the output files as soon as they are written if watch is set
+            monitors = list(monitors or [])
+            watching = watch and converter is not None
+            if watching:
+                monitors.append(converter)
+            exit_codes.append(self._executor.execute(self.directory_path, f"{self._piclas} parameter.ini",
+                                                     log_file="piclas.log", ranks=self.parallel, cores=self._cores,
+                                                     monitors=monitors, stage="piclas"))
+            if watching:
+                exit_codes.append(converter.exit_code)
+                converter = None
+
+        if converter is not None:
             # h5 files except mesh.h5
             h5_files = self._find_h5files(self.directory_path)
+            exit_codes.append(converter.convert(h5_files))
+        elif PICLAS2VTK and not self._executor.is_local:
+            # The output files only exist once the job ran, convert them in a job of its own
+            exit_codes.append(self._executor.execute(
+                self.directory_path,
+                f'for h5_file in *_DSMCState_*.h5; do {self._piclas2vtk} parameter.ini "$h5_file"; done',
+                log_file="piclas2vtk.log", stage="piclas2vtk"))
+
+        return next((exit_code for exit_code in exit_codes if exit_code != 0), 0)
 
-            for h5_file in h5_files:
-                subprocess.call(
-                    f"cd {self.directory_path} && {self._piclas2vtk} parameter.ini {h5_file} | tee piclas2vtk.log",
-                    shell=True)
+    def rerun(self, h5_file: str, monitors: list = None) -> int:
+        return self._executor.execute(self.directory_path, f"{self._piclas} parameter.ini {h5_file}",
+                                      log_file="piclas.log", ranks=self.parallel, cores=self._cores,
+                                      monitors=monitors, stage="piclas")
 
-    def rerun(self, h5_file: str):
-        subprocess.call(
-            f"cd {self.directory_path} && mpirun -np {self._parallel}  {self._piclas} parameter.ini {h5_file} | tee piclas.log",
-            shell=True)
+    def submit(self, h5_file: str = None, **kwargs):
+        # Non-blocking run or rerun, the returned future holds the exit code
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=1)
+
+        if h5_file is None:
+            return self._pool.submit(self.run, **kwargs)
+        return self._pool.submit(self.rerun, h5_file, **kwargs)
+
+    def _autotuned_parallel(self) -> int:
+        # Imported here because the autotuner runs its benchmarks with a Runner
+        from src.runner.parallel.autotuner import Autotuner
+
+        mesh_files = [file for file in catalog(self.directory_path).files() if file.endswith('_mesh.h5')]
+        if len(mesh_files) == 0:
+            return Parallel().physical_cores
+
+        # Fall back to all physical cores for meshes that are not similar to a benchmarked one
+        best_ranks = Autotuner().best_ranks(mesh_file=f"{self.directory_path}/{mesh_files[0]}")
+        self._parallel = Parallel().physical_cores if best_ranks is None else best_ranks
+        return self._parallel
 
     @staticmethod
     def _find_h5files(directory_path: str):
-        dsmc_state_files = [f'{file}' for file in os.listdir(directory_path) if
-                            'DSMCState' in file and file.endswith('.h5')]
-        dsmc_state_files.sort()
-
-        return dsmc_state_files
+        return find_dsmc_state_files(directory_path)
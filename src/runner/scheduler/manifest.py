@@ -0,0 +1,111 @@
+import json
+import os
+import sqlite3
+import time
+
+from src.utility.cache import hash_files
+from src.utility.catalog import catalog
+
+
+class Manifest:
+
+    # Files of a case directory that define the case
+    INPUT_EXTENSIONS = ('.ini', '.geo', '.msh')
+
+    def __init__(self, manifest_file: str = "./sweep.sqlite", max_retries: int = 2):
+        self.manifest_file = manifest_file
+        self.max_retries = max_retries
+
+        with self._connect() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS cases (
+                    directory TEXT PRIMARY KEY,
+                    inputs_hash TEXT,
+                    state TEXT,
+                    attempts INTEGER,
+                    exit_code INTEGER,
+                    wall_time REAL,
+                    output_files TEXT,
+                    updated REAL
+                )""")
+
+    def register(self, directory_path: str):
+        # A case whose inputs changed since the last sweep starts over
+        directory = os.path.abspath(directory_path)
+        inputs_hash = self.inputs_hash(directory_path)
+        case = self.case(directory_path)
+        if case is not None and case["inputs_hash"] == inputs_hash:
+            return case
+
+        with self._connect() as connection:
+            connection.execute("INSERT OR REPLACE INTO cases VALUES (?, ?, 'pending', 0, NULL, NULL, '[]', ?)",
+                               (directory, inputs_hash, time.time()))
+        return self.case(directory_path)
+
+    def plan(self, directory_path: str):
+        # "skip", "run" or "resume" for a registered case
+        case = self.case(directory_path)
+        if case is None or case["state"] == "pending":
+            return "run"
+        if case["state"] == "done":
+            return "skip"
+        if case["attempts"] > self.max_retries:
+            return "skip"
+
+        # A case left running by a crashed sweep continues from its latest state file
+        if case["state"] == "running" and self.latest_state_file(directory_path) is not None:
+            return "resume"
+        return "run"
+
+    def start(self, directory_path: str):
+        with self._connect() as connection:
+            connection.execute("UPDATE cases SET state = 'running', attempts = attempts + 1, updated = ? "
+                               "WHERE directory = ?", (time.time(), os.path.abspath(directory_path)))
+
+    def finish(self, directory_path: str, exit_code: int, wall_time: float):
+        output_files = sorted(file for file in catalog(directory_path).files()
+                              if file.endswith('.h5') or file.endswith('.vtu') or file.endswith('.csv'))
+        with self._connect() as connection:
+            connection.execute("UPDATE cases SET state = ?, exit_code = ?, wall_time = ?, output_files = ?, updated = ? "
+                               "WHERE directory = ?",
+                               ("done" if exit_code == 0 else "failed", exit_code, wall_time,
+                                json.dumps(output_files), time.time(), os.path.abspath(directory_path)))
+
+    def case(self, directory_path: str):
+        with self._connect() as connection:
+            row = connection.execute("SELECT * FROM cases WHERE directory = ?",
+                                     (os.path.abspath(directory_path),)).fetchone()
+        return None if row is None else self._to_dict(row)
+
+    def cases(self):
+        with self._connect() as connection:
+            rows = connection.execute("SELECT * FROM cases ORDER BY directory").fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def inputs_hash(self, directory_path: str) -> str:
+        input_files = sorted(f"{directory_path}/{file}" for file in catalog(directory_path).files()
+                             if file.endswith(self.INPUT_EXTENSIONS))
+        return hash_files(input_files)
+
+    @staticmethod
+    def latest_state_file(directory_path: str):
+        latest = catalog(directory_path).latest("State")
+        return None if latest is None else latest[1]
+
+    def _connect(self):
+        # A connection per call, the scheduler updates the manifest from several threads
+        return sqlite3.connect(self.manifest_file, timeout=60)
+
+    @staticmethod
+    def _to_dict(row):
+        directory, inputs_hash, state, attempts, exit_code, wall_time, output_files, updated = row
+        return {
+            "directory": directory,
+            "inputs_hash": inputs_hash,
+            "state": state,
+            "attempts": attempts,
+            "exit_code": exit_code,
+            "wall_time": wall_time,
+            "output_files": json.loads(output_files),
+            "updated": updated,
+        }
@@ -0,0 +1,124 @@
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from src.runner.parallel.parallel import Parallel
+
+
+class Pipeline:
+
+    def __init__(self,
+                 simulators: list,
+                 run_options: dict or list = None,
+                 spare_cores: int = 1,
+                 PICLAS2VTK: bool = True,
+                 reduce=None):
+
+        if len(simulators) == 0:
+            raise ValueError("At least one simulator is required.")
+        if spare_cores < 1:
+            raise ValueError("At least one spare core is required for the preparation and the postprocessing.")
+
+        # The same Simulator.run options for every case if a single dictionary is given
+        if run_options is None:
+            run_options = {}
+        if isinstance(run_options, dict):
+            run_options = [run_options] * len(simulators)
+        if len(run_options) != len(simulators):
+            raise ValueError("The number of run options must match the number of simulators.")
+
+        # The MPI job of a case has to leave the spare cores idle, otherwise the stages compete for the same cores
+        physical_cores = Parallel().physical_cores
+        for simulator in simulators:
+            if simulator.parallel + spare_cores > physical_cores:
+                warnings.warn(f"{simulator.directory_path} runs on {simulator.parallel} of {physical_cores} cores, "
+                              f"leaving fewer than {spare_cores} spare cores for the pipeline.")
+
+        self._simulators = simulators
+        self._run_options = run_options
+        self._spare_cores = spare_cores
+        self._piclas2vtk = PICLAS2VTK
+        self._reduce = reduce
+        self._cases = [{
+            "directory": simulator.directory_path,
+            "status": "pending",
+            "exit_code": None,
+            "wall_time": None,
+            "result": None,
+            "error": None
+        } for simulator in simulators]
+        self._start_times = [None] * len(simulators)
+
+    @property
+    def cases(self):
+        return self._cases
+
+    def run(self):
+        # Preparation of case N+1 and postprocessing of case N-1 overlap the PICLAS run of case N
+        with ThreadPoolExecutor(max_workers=self._spare_cores) as pool:
+            prepared = pool.submit(self._prepare, 0)
+            postprocessed = []
+
+            for index in range(len(self._simulators)):
+                ready = prepared.result()
+                if index + 1 < len(self._simulators):
+                    prepared = pool.submit(self._prepare, index + 1)
+
+                if ready:
+                    exit_code = self._solve(index)
+                    postprocessed.append(pool.submit(self._postprocess, index, exit_code))
+
+            for future in postprocessed:
+                future.result()
+
+        return self._cases
+
+    def report(self):
+        print(f"{'case':<50}{'status':>10}{'exit':>6}{'wall time [s]':>16}")
+        for case in self._cases:
+            exit_code = "-" if case["exit_code"] is None else case["exit_code"]
+            wall_time = "-" if case["wall_time"] is None else f"{case['wall_time']:.1f}"
+            print(f"{case['directory']:<50}{case['status']:>10}{exit_code:>6}{wall_time:>16}")
+
+    def _prepare(self, index: int) -> bool:
+        case = self._cases[index]
+        case["status"] = "preparing"
+        self._start_times[index] = time.perf_counter()
+        # Any error fails only this case, the other cases of the pipeline go on
+        try:
+            self._simulators[index].prepare(**self._run_options[index])
+        except Exception as error:
+            case["error"] = repr(error)
+            self._finish(index, -1)
+            return False
+        return True
+
+    def _solve(self, index: int) -> int:
+        case = self._cases[index]
+        case["status"] = "solving"
+        try:
+            return self._simulators[index].solve()
+        except Exception as error:
+            case["error"] = repr(error)
+            return -1
+
+    def _postprocess(self, index: int, exit_code: int):
+        case = self._cases[index]
+        simulator = self._simulators[index]
+        case["status"] = "postprocessing"
+
+        # The conversion runs on the spare cores, one worker per pipeline thread
+        try:
+            exit_code = simulator.postprocess(exit_code=exit_code, PICLAS2VTK=self._piclas2vtk, workers=1)
+            if self._reduce is not None and exit_code == 0:
+                case["result"] = self._reduce(simulator)
+        except Exception as error:
+            case["error"] = repr(error)
+            exit_code = -1
+        self._finish(index, exit_code)
+
+    def _finish(self, index: int, exit_code: int):
+        case = self._cases[index]
+        case["exit_code"] = exit_code
+        case["wall_time"] = time.perf_counter() - self._start_times[index]
+        case["status"] = "done" if exit_code == 0 else "failed"
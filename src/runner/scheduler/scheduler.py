@@ -0,0 +1,168 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from src.runner.parallel.parallel import CoreAllocator, Parallel
+from src.runner.runner import Runner
+from src.runner.scheduler.manifest import Manifest
+from src.utility.utility import save_history
+
+
+class Scheduler:
+
+    def __init__(self,
+                 case_directories: list,
+                 ranks: int or list = None,
+                 total_cores: int = None,
+                 HOPR: bool = True,
+                 bind: bool = True,
+                 manifest: Manifest = None):
+
+        if len(case_directories) == 0:
+            raise ValueError("At least one case directory is required.")
+
+        if total_cores is None:
+            total_cores = Parallel().physical_cores
+
+        # Hand every job its own set of cores, only the cores this process may use can be handed out
+        self._allocator = None
+        if bind:
+            self._allocator = CoreAllocator(total_cores=total_cores)
+            total_cores = min(total_cores, self._allocator.free_cores)
+
+        # Share the machine evenly between the cases if no rank budget is given
+        if ranks is None:
+            ranks = max(1, total_cores // len(case_directories))
+        if isinstance(ranks, int):
+            ranks = [ranks] * len(case_directories)
+
+        if len(ranks) != len(case_directories):
+            raise ValueError("The number of rank budgets must match the number of case directories.")
+        for rank in ranks:
+            if rank < 1 or rank > total_cores:
+                raise ValueError(f"Rank budget {rank} must be between 1 and the total number of cores {total_cores}.")
+
+        self._total_cores = total_cores
+        self._free_cores = total_cores
+        self._hopr = HOPR
+        self._manifest = manifest
+        self._cases = [{
+            "directory": directory,
+            "ranks": rank,
+            "cores": None,
+            "status": "pending",
+            "exit_code": None,
+            "wall_time": None,
+            "error": None
+        } for directory, rank in zip(case_directories, ranks)]
+
+    @classmethod
+    def from_run_all(cls,
+                     case_name: str or list,
+                     start_case: int,
+                     end_case: int,
+                     simulation_directory_path: str = "./simulations",
+                     ranks: int or list = None,
+                     total_cores: int = None,
+                     bind: bool = True,
+                     manifest: Manifest = None):
+        # Same case layout as generate_run_all
+        if type(case_name) is str:
+            case_name = [case_name]
+
+        case_directories = [f"{simulation_directory_path}/{name}{i}"
+                            for name in case_name for i in range(start_case, end_case)]
+
+        return cls(case_directories, ranks=ranks, total_cores=total_cores, bind=bind, manifest=manifest)
+
+    @property
+    def cases(self):
+        return self._cases
+
+    @property
+    def total_cores(self):
+        return self._total_cores
+
+    def run(self):
+        pending = list(self._cases)
+        running = set()
+
+        # Skip the cases a previous sweep already finished or gave up on
+        if self._manifest is not None:
+            for case in list(pending):
+                self._manifest.register(case["directory"])
+                if self._manifest.plan(case["directory"]) == "skip":
+                    pending.remove(case)
+                    recorded = self._manifest.case(case["directory"])
+                    case["status"] = recorded["state"]
+                    case["exit_code"] = recorded["exit_code"]
+                    case["wall_time"] = recorded["wall_time"]
+
+        with ThreadPoolExecutor(max_workers=self._total_cores) as pool:
+            while pending or running:
+
+                # Start the pending cases, in order, whose rank budget fits into the idle cores
+                for case in list(pending):
+                    if case["ranks"] <= self._free_cores:
+                        pending.remove(case)
+                        self._free_cores -= case["ranks"]
+                        if self._allocator is not None:
+                            case["cores"] = self._allocator.allocate(case["ranks"])
+                        running.add(pool.submit(self._run_case, case))
+
+                # Wait for a case to finish and give its cores back
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    case = future.result()
+                    self._free_cores += case["ranks"]
+                    if self._allocator is not None:
+                        self._allocator.release(case["cores"])
+
+                    # Retry failed cases until the manifest runs out of retries
+                    if (case["status"] == "failed" and self._manifest is not None
+                            and self._manifest.plan(case["directory"]) != "skip"):
+                        case["status"] = "pending"
+                        pending.append(case)
+
+        return self._cases
+
+    def report(self):
+        print(f"{'case':<50}{'ranks':>8}{'status':>10}{'exit':>6}{'wall time [s]':>16}")
+        for case in self._cases:
+            exit_code = "-" if case["exit_code"] is None else case["exit_code"]
+            wall_time = "-" if case["wall_time"] is None else f"{case['wall_time']:.1f}"
+            print(f"{case['directory']:<50}{case['ranks']:>8}{case['status']:>10}{exit_code:>6}{wall_time:>16}")
+
+    def _run_case(self, case: dict):
+        runner = Runner(directory_path=case["directory"], parallel=case["ranks"], cores=case["cores"])
+
+        plan = "run" if self._manifest is None else self._manifest.plan(case["directory"])
+        if self._manifest is not None:
+            self._manifest.start(case["directory"])
+
+        case["status"] = "running"
+        case["error"] = None
+        start = time.perf_counter()
+        try:
+            if plan == "resume":
+                case["exit_code"] = self._resume_case(runner, case["directory"])
+            else:
+                case["exit_code"] = runner.run(HOPR=self._hopr, PICLAS=True)
+        except Exception as error:
+            # The case fails but its cores still have to be released
+            case["error"] = repr(error)
+            case["exit_code"] = -1
+        case["wall_time"] = time.perf_counter() - start
+        case["status"] = "done" if case["exit_code"] == 0 else "failed"
+
+        if self._manifest is not None:
+            self._manifest.finish(case["directory"], exit_code=case["exit_code"], wall_time=case["wall_time"])
+
+        return case
+
+    def _resume_case(self, runner: Runner, directory_path: str) -> int:
+        # Same as Simulator.rerun: keep the interrupted outputs and continue from the latest state file
+        state_file = self._manifest.latest_state_file(directory_path)
+        state_time = float(state_file.split('_State_')[-1].split('.h5')[0])
+        save_history(directory_path=directory_path, index=0, history=f'rerun_{state_time}', STATE=True)
+
+        return runner.rerun(h5_file=state_file)
@@ -3,10 +3,21 @@ import subprocess
 
 from src.fluid.fluid import Fluid
 from src.geometry.geometry import Geometry
+from src.postprocessing.results_store import ResultsStore
+from src.preflight.advisor import Advisor
+from src.preflight.collision import CollisionPartner
+from src.preflight.estimator import Estimator
+from src.preflight.load_balance import LoadBalance
+from src.runner.archiver.archiver import Archiver
+from src.runner.executor.executor import Executor
+from src.runner.monitor.steady_state import SteadyStateMonitor
 from src.runner.runner import Runner
 from src.transfer.atlas_to_piclas import AtlasToPiclas
+from src.utility.cache import MeshCache, ResultCache, mesh_fingerprint
+from src.utility.catalog import catalog
 from src.utility.shell_scripts import generate_scripts
 from src.utility.utility import save_history
+from src.utility.warm_start import WarmStart
 
 
 class Simulator:
@@ -15,7 +26,15 @@ class Simulator:
                  project_name: str,
                  directory_path: str,
                  fluid: Fluid,
-                 geometry: Geometry):
+                 geometry: Geometry,
+                 cache: ResultCache = None,
+                 mesh_cache: MeshCache = None,
+                 warm_start: WarmStart = None,
+                 load_balance: LoadBalance or str = None,
+                 collision_partner: CollisionPartner or str = None,
+                 parallel: int or str = None,
+                 executor: Executor = None,
+                 results_store: ResultsStore = None):
 
         # Set the parameters
         os.makedirs(directory_path, exist_ok=True)
@@ -24,27 +43,75 @@ class Simulator:
         self.directory_path = directory_path
         self.__fluid = fluid
         self.__geometry = geometry
+        self.__cache = cache
+        self.__mesh_cache = mesh_cache
+        self.__warm_start = warm_start
+        self.__results_store = results_store
+        self.__prepared = None
         generate_scripts(directory_path=directory_path)
 
+        # Set the runner
+        self.__runner = Runner(directory_path=self.directory_path, parallel=parallel, executor=executor)
+
+        # Turn on load balancing if the estimated particles are unevenly distributed over the ranks
+        if load_balance == "auto":
+            load_balance = LoadBalance.auto(fluid=fluid, geometry=geometry, ranks=self.__runner.parallel)
+
+        # Choose the octree or the nearest neighbour collision partner search from the predicted particles per cell
+        if collision_partner == "auto":
+            collision_partner = CollisionPartner.auto(fluid=fluid, geometry=geometry)
+
         # Set the transfer
         self.__atlas_to_piclas = AtlasToPiclas(project_name=project_name,
                                                directory_path=directory_path,
                                                fluid=fluid,
-                                               geometry=geometry)
+                                               geometry=geometry,
+                                               load_balance=load_balance,
+                                               collision_partner=collision_partner)
 
-        # Set the runner
-        self.__runner = Runner(directory_path=self.directory_path)
+    @property
+    def parallel(self):
+        return self.__runner.parallel
 
     def run(self,
             start_time: float = 0,
             end_time: float = None,
             time_step: float = None,
             number_of_output_files: int = 10,
-            sampling_fraction: float = 0.5):
+            sampling_fraction: float = 0.5,
+            steady_state: SteadyStateMonitor = None,
+            preflight: bool = False):
 
-        # Run HOPR
+        self.prepare(start_time=start_time,
+                     end_time=end_time,
+                     time_step=time_step,
+                     number_of_output_files=number_of_output_files,
+                     sampling_fraction=sampling_fraction,
+                     steady_state=steady_state,
+                     preflight=preflight)
+
+        return self.postprocess(exit_code=self.solve())
+
+    def prepare(self,
+                start_time: float = 0,
+                end_time: float = None,
+                time_step: float = None,
+                number_of_output_files: int = 10,
+                sampling_fraction: float = 0.5,
+                steady_state: SteadyStateMonitor = None,
+                preflight: bool = False):
+
+        # Use the largest time step that is valid for the mean collision time and the cell sizes
+        if time_step is None:
+            time_step = Advisor(fluid=self.__fluid, geometry=self.__geometry).time_step()
+
+        # Estimate the particles, memory and wall time, refusing cases that cannot fit into the node
+        if preflight:
+            estimator = Estimator(fluid=self.__fluid, geometry=self.__geometry, ranks=self.__runner.parallel)
+            estimator.check(simulation_time=end_time - start_time, time_step=time_step)
+
+        # Create the HOPR file
         self.__geometry.create_hopr_file(project_name=self.project_name, hopr_file_directory=f"{self.directory_path}")
-        self.__runner.run(HOPR=True)
 
         # Transfer the data to PICLAS
         self.__atlas_to_piclas.create_parameter_ini(start_time=start_time,
@@ -53,8 +120,135 @@ class Simulator:
                                                     number_of_output_files=number_of_output_files,
                                                     sampling_fraction=sampling_fraction)
 
-        # Run PICLAS
-        self.__runner.run(PICLAS=True)
+        # Options of the solve and postprocess stages
+        self.__prepared = {
+            "start_time": start_time,
+            "end_time": end_time,
+            "time_step": time_step,
+            "number_of_output_files": number_of_output_files,
+            "sampling_fraction": sampling_fraction,
+            "steady_state": steady_state,
+            "cache_key": None,
+            "restored": False,
+            "restart": None,
+        }
+
+        # Restore the results of an identical case instead of running HOPR and PICLAS
+        if self.__cache is not None:
+            cache_key = self.__cache.key(directory_path=self.directory_path, mesh_file=self.__geometry.mesh_file)
+            self.__prepared["cache_key"] = cache_key
+            if self.__cache.restore(key=cache_key, directory_path=self.directory_path):
+                self.__prepared["restored"] = True
+                return
+
+        # Run HOPR
+        self.__run_hopr()
+
+        # Initialize the case from the converged state of the closest case on the same mesh
+        if self.__warm_start is not None:
+            self.__prepared["restart"] = self.__warm_start.initialize(directory_path=self.directory_path,
+                                                                      project_name=self.project_name,
+                                                                      fluid=self.__fluid,
+                                                                      geometry=self.__geometry)
+
+    def solve(self) -> int:
+        if self.__prepared is None:
+            raise ValueError("The case must be prepared before it is solved.")
+        prepared = self.__prepared
+        if prepared["restored"]:
+            return 0
+
+        # Stop PICLAS at the first state file after the flow became steady
+        steady_state = prepared["steady_state"]
+        monitors = [] if steady_state is None else [steady_state]
+
+        if prepared["restart"] is None:
+            # Run PICLAS
+            exit_code = self.__runner.run(PICLAS=True, monitors=monitors)
+        else:
+            # PICLAS continues from the time of the state file, keep the requested simulation duration
+            # The sampling fraction is a fraction of Tend, sample the same share of the restarted run only
+            restart_file, restart_time = prepared["restart"]
+            duration = prepared["end_time"] - prepared["start_time"]
+            self.__atlas_to_piclas.create_parameter_ini(
+                start_time=restart_time,
+                end_time=restart_time + duration,
+                time_step=prepared["time_step"],
+                number_of_output_files=prepared["number_of_output_files"],
+                sampling_fraction=prepared["sampling_fraction"] * duration / (restart_time + duration))
+            exit_code = self.__runner.rerun(h5_file=restart_file, monitors=monitors)
+
+        # Restart from the steady state with sampling over the whole restarted run
+        if steady_state is not None and steady_state.stopped and steady_state.sampling_duration is not None:
+            restart_end_time = steady_state.state_time + steady_state.sampling_duration
+            exit_code = self.rerun(start_time=steady_state.state_time,
+                                   end_time=restart_end_time,
+                                   time_step=prepared["time_step"],
+                                   number_of_output_files=prepared["number_of_output_files"],
+                                   sampling_fraction=steady_state.sampling_duration / restart_end_time)
+
+        return exit_code
+
+    def postprocess(self,
+                    exit_code: int = 0,
+                    PICLAS2VTK: bool = False,
+                    workers: int = None,
+                    archive: bool = False,
+                    float32: bool = False) -> int:
+        if self.__prepared is None:
+            raise ValueError("The case must be prepared before it is postprocessed.")
+        prepared = self.__prepared
+
+        # A batch executor only submitted the jobs, an exit code of 0 means that the outputs are still to come
+        finished = exit_code == 0 and (self.__runner.executor.is_local or prepared["restored"])
+
+        # Store the results of a successful run
+        if not prepared["restored"] and finished:
+            if prepared["cache_key"] is not None:
+                self.__cache.store(key=prepared["cache_key"], directory_path=self.directory_path)
+            if self.__warm_start is not None:
+                self.__warm_start.register(directory_path=self.directory_path,
+                                           project_name=self.project_name,
+                                           fluid=self.__fluid,
+                                           geometry=self.__geometry)
+
+        # Convert the DSMCState files that are not converted yet
+        if PICLAS2VTK and exit_code == 0:
+            exit_code = self.__runner.run(PICLAS2VTK=True, workers=workers)
+
+        # Collect the inputs and the scalar results of the case for queries across the sweep
+        if self.__results_store is not None and finished and exit_code == 0:
+            self.__results_store.add(directory_path=self.directory_path,
+                                     project_name=self.project_name,
+                                     fluid=self.__fluid,
+                                     geometry=self.__geometry)
+
+        # Compress the outputs once they are converted, the latest state file stays as it is for restarts
+        if archive and finished and exit_code == 0:
+            exit_code = Archiver(directory_path=self.directory_path, workers=workers, float32=float32).archive()
+
+        return exit_code
+
+    def __run_hopr(self):
+        mesh_h5_file = f"{self.directory_path}/{self.project_name}_mesh.h5"
+
+        # Link the mesh of an identical HOPR run instead of running HOPR
+        fingerprint = None
+        if self.__mesh_cache is not None:
+            fingerprint = mesh_fingerprint(self.__geometry)
+            if self.__mesh_cache.link(fingerprint=fingerprint, mesh_h5_file=mesh_h5_file):
+                return 0
+
+        # HOPR overwrites the mesh in place, which would write through a hard link into the mesh cache
+        if os.path.exists(mesh_h5_file) and os.stat(mesh_h5_file).st_nlink > 1:
+            os.remove(mesh_h5_file)
+
+        exit_code = self.__runner.run(HOPR=True)
+
+        if fingerprint is not None and exit_code == 0 and os.path.exists(mesh_h5_file):
+            self.__mesh_cache.store(fingerprint=fingerprint, mesh_h5_file=mesh_h5_file)
+
+        return exit_code
 
     def rerun(self,
               start_time: float = 0,
@@ -77,10 +271,10 @@ class Simulator:
                                                     sampling_fraction=sampling_fraction)
 
         # Run PICLAS
-        self.__runner.rerun(h5_file=h5_file)
+        return self.__runner.rerun(h5_file=h5_file)
 
     def clean(self):
-        for file in os.listdir(self.directory_path):
+        for file in catalog(self.directory_path).files():
             if ((file.endswith('.h5') and '_mesh' not in file)
                     or file.endswith('.vtu') or file.endswith('.csv')
                     or file.endswith('.tmp') or file.endswith('.dat')
@@ -1,8 +1,9 @@
-import os
-
 from src.fluid.fluid import Fluid
 from src.geometry.geometry import Geometry
+from src.preflight.collision import CollisionPartner
+from src.preflight.load_balance import LoadBalance
 from src.primitive.parser.parameter_ini import ParameterINI
+from src.utility.catalog import catalog
 
 
 class AtlasToPiclas:
@@ -11,30 +12,25 @@ class AtlasToPiclas:
                  project_name: str,
                  directory_path: str,
                  fluid: Fluid,
-                 geometry: Geometry):
+                 geometry: Geometry,
+                 load_balance: LoadBalance = None,
+                 collision_partner: CollisionPartner = None):
         self.__dimensions = geometry.get_dimensions()
         self.__project_name = project_name
         self.__directory_path = directory_path
         self.__fluid = fluid
         self.__geometry = geometry
+        self.__load_balance = LoadBalance() if load_balance is None else load_balance
+        self.__collision_partner = CollisionPartner() if collision_partner is None else collision_partner
 
     def find_state_h5_file(self, time: float):
 
-        # find the files that contains '_State_' in the name.
-        h5_files = [f'{self.__directory_path}/{file}' for file in os.listdir(self.__directory_path) if
-                    '_State_' in file and file.endswith('.h5')]
-        h5_files.sort()
-        h5_files = [file.split('/')[-1] for file in h5_files]
-        h5_times = [float(file.split('_State_')[-1].split('.h5')[0]) for file in h5_files]
-
-        # find the closest time to the given time
-        closest_time = min(h5_times, key=lambda x: abs(x - time))
-        closest_time_index = h5_times.index(closest_time)
-
-        # find the state file
-        state_file = h5_files[closest_time_index]
+        # find the state file with the closest time to the given time
+        closest = catalog(self.__directory_path).nearest("State", time)
+        if closest is None:
+            raise ValueError(f"There is no state file in {self.__directory_path}.")
 
-        return state_file
+        return closest[1]
 
     def create_parameter_ini(self,
                              start_time: float,
@@ -87,9 +83,10 @@ UseDSMC=T
 Particles-DSMC-CollisMode={self.__fluid.get_collision_model()}
 Particles-DSMC-CalcSurfaceVal=T
 Particles-DSMC-CalcQualityFactors=T
-Particles-DSMC-UseOctree=F
-Particles-DSMC-UseNearestNeighbour=T
 """
+        for key, value in self.__collision_partner.options.items():
+            dsmc_options += f"{key}={value}\n"
+
         return dsmc_options
 
     @staticmethod
@@ -98,7 +95,8 @@ Particles-DSMC-UseNearestNeighbour=T
                        time_step: float,
                        number_of_output_files: int,
                        sampling_fraction: float):
-
+        # Tend is absolute, the output intervals follow the duration of the run so that a restart writes as often
+        duration = end_time - start_time
         options = f"""
 !=============================================================================== !
 ! TIME
@@ -106,9 +104,9 @@ Particles-DSMC-UseNearestNeighbour=T
 !Tstart={start_time}
 Tend={end_time}
 ManualTimeStep={time_step}
-IterDisplayStep={int(end_time / time_step / 100)}
-Part-AnalyzeStep={int(end_time / time_step / 100)}
-Analyze_dt={end_time / 10}
+IterDisplayStep={max(1, int(duration / time_step / 100))}
+Part-AnalyzeStep={max(1, int(duration / time_step / 100))}
+Analyze_dt={duration / 10}
 Part-TimeFracForSampling={sampling_fraction}
 Particles-NumberForDSMCOutputs={number_of_output_files}
 """
@@ -181,18 +179,22 @@ Part-Species{num_of_species}-nInits={len(self.__fluid.internal_fluxes)}
         return fluid_options
 
     def __parameter_options(self):
-        return f"""
+        parameter_options = """
 !=============================================================================== !
 ! PARAMETERS
 !=============================================================================== !
+"""
+        if self.__collision_partner.reason is not None:
+            parameter_options += f"! Collision partner selection: {self.__collision_partner.reason}\n"
+
+        parameter_options += f"""\
 ProjectName={self.__project_name}
 MeshFile={self.__project_name}_mesh.h5
 """
+        return parameter_options
 
-    @staticmethod
-    def __other_options():
-        # \TODO: The options should be set by the user in the future.
-        return """\
+    def __other_options(self):
+        other_options = """\
 !=============================================================================== !
 ! DISCRETIZATION OPTIONS
 !=============================================================================== !
@@ -204,14 +206,14 @@ CFLScale=0.2
 !=============================================================================== !
 ! LOAD BALANCE OPTIONS
 !=============================================================================== !
+"""
+        if self.__load_balance.imbalance is not None:
+            other_options += f"! Estimated rank imbalance: {self.__load_balance.imbalance:.2f}\n"
+        other_options += "\n"
+        for key, value in self.__load_balance.options.items():
+            other_options += f"{key}={value}\n"
 
-Particles-MPIWeight=1000
-DoLoadBalance=F
-UseH5IOLoadBalance=F
-PartWeightLoadBalance=T
-DoInitialAutoRestart=F
-InitialAutoRestart-PartWeightLoadBalance=F
-LoadBalanceMaxSteps=2
+        other_options += """\
 !=============================================================================== !
 ! OUTPUT OPTIONS
 !=============================================================================== !
@@ -228,3 +230,4 @@ NVisu=1
 CalcPointsPerDebyeLength=F
 
 """
+        return other_options
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import shutil
+
+from src.utility.catalog import catalog
+from src.utility.utility import clone_file
+
+
+def hash_files(file_paths: list, hasher=None) -> str:
+    if hasher is None:
+        hasher = hashlib.sha256()
+
+    for file_path in file_paths:
+        hasher.update(os.path.basename(file_path).encode())
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                hasher.update(block)
+
+    return hasher.hexdigest()
+
+
+def mesh_fingerprint(geometry) -> str:
+    # The HOPR output only depends on the mesh file, the HOPR options and the boundaries
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps(geometry.hopr_options, sort_keys=True, default=str).encode())
+    hasher.update(json.dumps(geometry.get_boundary_names()).encode())
+
+    return hash_files([geometry.mesh_file], hasher)
+
+
+class ResultCache:
+
+    # Files of a case directory that are results of HOPR/PICLAS and not inputs
+    OUTPUT_EXTENSIONS = ('.h5', '.csv', '.dat', '.log', '.vtu', '.out')
+
+    def __init__(self,
+                 cache_directory: str = None,
+                 max_size: float = 100e9):
+        if cache_directory is None:
+            cache_directory = os.path.expanduser("~/.cache/atlas/results")
+        os.makedirs(cache_directory, exist_ok=True)
+
+        self.cache_directory = cache_directory
+        self.max_size = max_size
+
+    def key(self, directory_path: str, mesh_file: str) -> str:
+        # The inputs of a case are the rendered ini files and the mesh
+        return hash_files([f"{directory_path}/parameter.ini", f"{directory_path}/hopr.ini", mesh_file])
+
+    def contains(self, key: str) -> bool:
+        return os.path.isdir(f"{self.cache_directory}/{key}")
+
+    def restore(self, key: str, directory_path: str) -> bool:
+        entry_directory = f"{self.cache_directory}/{key}"
+        if not self.contains(key):
+            return False
+
+        for file in os.listdir(entry_directory):
+            clone_file(f"{entry_directory}/{file}", f"{directory_path}/{file}")
+
+        # Mark the entry as recently used
+        os.utime(entry_directory)
+        return True
+
+    def store(self, key: str, directory_path: str):
+        if self.contains(key):
+            os.utime(f"{self.cache_directory}/{key}")
+            return
+
+        # Write into a temporary directory first so that an interrupted store never leaves a partial entry
+        temporary_directory = f"{self.cache_directory}/.{key}.{os.getpid()}"
+        os.makedirs(temporary_directory, exist_ok=True)
+        for file in catalog(directory_path).files():
+            if file.endswith(self.OUTPUT_EXTENSIONS) and os.path.isfile(f"{directory_path}/{file}"):
+                clone_file(f"{directory_path}/{file}", f"{temporary_directory}/{file}")
+        os.rename(temporary_directory, f"{self.cache_directory}/{key}")
+
+        self.evict()
+
+    def evict(self):
+        # Remove the least recently used entries until the cache fits into max_size
+        entries = []
+        for key in os.listdir(self.cache_directory):
+            entry_directory = f"{self.cache_directory}/{key}"
+            if key.startswith('.') or not os.path.isdir(entry_directory):
+                continue
+            size = sum(os.path.getsize(f"{entry_directory}/{file}") for file in os.listdir(entry_directory))
+            entries.append((os.path.getmtime(entry_directory), size, entry_directory))
+        entries.sort()
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_directory in entries:
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(entry_directory)
+            total_size -= size
+
+    def clear(self):
+        shutil.rmtree(self.cache_directory)
+        os.makedirs(self.cache_directory, exist_ok=True)
+
+
+class MeshCache:
+
+    def __init__(self, cache_directory: str = None):
+        if cache_directory is None:
+            cache_directory = os.path.expanduser("~/.cache/atlas/meshes")
+        os.makedirs(cache_directory, exist_ok=True)
+
+        self.cache_directory = cache_directory
+
+    def contains(self, fingerprint: str) -> bool:
+        return os.path.isfile(self._mesh_path(fingerprint))
+
+    def link(self, fingerprint: str, mesh_h5_file: str) -> bool:
+        if not self.contains(fingerprint):
+            return False
+
+        if os.path.exists(mesh_h5_file):
+            os.remove(mesh_h5_file)
+        _link_or_clone(self._mesh_path(fingerprint), mesh_h5_file)
+
+        return True
+
+    def store(self, fingerprint: str, mesh_h5_file: str):
+        if self.contains(fingerprint):
+            return
+
+        # Link into a temporary file first so that an interrupted store never leaves a partial mesh
+        os.makedirs(f"{self.cache_directory}/{fingerprint}", exist_ok=True)
+        temporary_file = f"{self._mesh_path(fingerprint)}.{os.getpid()}"
+        _link_or_clone(mesh_h5_file, temporary_file)
+        os.rename(temporary_file, self._mesh_path(fingerprint))
+
+    def _mesh_path(self, fingerprint: str) -> str:
+        return f"{self.cache_directory}/{fingerprint}/mesh.h5"
+
+
+def _link_or_clone(source: str, destination: str):
+    # Hard links fail across file systems, fall back to a reflink or a copy
+    try:
+        os.link(source, destination)
+    except OSError:
+        clone_file(source, destination)
@@ -0,0 +1,107 @@
+import bisect
+import os
+import re
+import threading
+import time
+
+# PICLAS outputs are named <project>_<type>_<time>.h5, e.g. box_State_000.0000010000.h5
+_OUTPUT_PATTERN = re.compile(r'^.+_(?P<kind>[A-Za-z]+)_(?P<time>[0-9.Ee+-]+)\.h5$')
+
+# A directory changed within this many nanoseconds of a scan may change again without a new modification time
+_RACY_NANOSECONDS = 2_000_000_000
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def catalog(directory_path: str):
+    # One catalog per case directory shared by all the readers of the directory
+    directory = os.path.abspath(directory_path)
+    with _catalogs_lock:
+        if directory not in _catalogs:
+            _catalogs[directory] = Catalog(directory)
+        return _catalogs[directory]
+
+
+class Catalog:
+
+    def __init__(self, directory_path: str):
+        self.directory_path = directory_path
+        self._lock = threading.Lock()
+        self._files = {}
+        self._timed = {}
+        self._mtime = None
+
+    def files(self, kind: str = None):
+        # All files by name, or the outputs of one type, e.g. "State" or "DSMCState", by simulation time
+        self.refresh()
+        with self._lock:
+            if kind is None:
+                return sorted(self._files)
+            return [file for _, file in self._timed.get(kind, [])]
+
+    def times(self, kind: str):
+        self.refresh()
+        with self._lock:
+            return [simulation_time for simulation_time, _ in self._timed.get(kind, [])]
+
+    def nearest(self, kind: str, simulation_time: float):
+        self.refresh()
+        with self._lock:
+            entries = self._timed.get(kind, [])
+            if len(entries) == 0:
+                return None
+
+            # The neighbours of the insertion point are the only candidates
+            index = bisect.bisect_left(entries, (simulation_time,))
+            candidates = entries[max(0, index - 1):index + 1]
+            return min(candidates, key=lambda entry: abs(entry[0] - simulation_time))
+
+    def latest(self, kind: str):
+        self.refresh()
+        with self._lock:
+            entries = self._timed.get(kind, [])
+            return entries[-1] if entries else None
+
+    def refresh(self):
+        try:
+            mtime = os.stat(self.directory_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        with self._lock:
+            if mtime is not None and mtime == self._mtime:
+                return
+
+            names = set(os.listdir(self.directory_path)) if mtime is not None else set()
+            for file in set(self._files) - names:
+                self._remove(file)
+            for file in names - set(self._files):
+                self._add(file)
+
+            # Scan again next time if the directory may still change within its current modification time
+            self._mtime = mtime if mtime is not None and time.time_ns() - mtime > _RACY_NANOSECONDS else None
+
+    def _add(self, file: str):
+        match = _OUTPUT_PATTERN.match(file)
+        if match is None:
+            self._files[file] = None
+            return
+
+        try:
+            entry = (float(match.group("time")), file)
+        except ValueError:
+            self._files[file] = None
+            return
+
+        self._files[file] = (match.group("kind"), entry)
+        bisect.insort(self._timed.setdefault(match.group("kind"), []), entry)
+
+    def _remove(self, file: str):
+        output = self._files.pop(file)
+        if output is None:
+            return
+
+        kind, entry = output
+        entries = self._timed[kind]
+        del entries[bisect.bisect_left(entries, entry)]
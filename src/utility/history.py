@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import shutil
+import stat
+
+from src.utility.utility import clone_file
+
+
+class HistoryStore:
+
+    def __init__(self, directory_path: str, store_directory: str = None):
+        if store_directory is None:
+            store_directory = f"{directory_path}/.history"
+        os.makedirs(f"{store_directory}/objects", exist_ok=True)
+
+        self.directory_path = directory_path
+        self.store_directory = store_directory
+        self._index_file = f"{store_directory}/index.json"
+        self._index = self._load()
+
+    def snapshots(self):
+        return sorted(self._index["snapshots"])
+
+    def files(self, name: str):
+        return dict(self._index["snapshots"][name])
+
+    def snapshot(self, name: str, files: list, move: list = None):
+        # Every file of the snapshot is a hard link to an object, identical files of all snapshots share one object
+        move = set() if move is None else set(move)
+        snapshot_directory = f"{self.directory_path}/{name}"
+        os.makedirs(snapshot_directory, exist_ok=True)
+
+        entries = self._index["snapshots"].setdefault(name, {})
+        for file in files:
+            source = f"{self.directory_path}/{file}"
+            digest = self._store_object(source, file, move=file in move)
+
+            destination = f"{snapshot_directory}/{file}"
+            if os.path.lexists(destination):
+                os.remove(destination)
+            os.link(self._object_path(digest), destination)
+            entries[file] = digest
+
+        self._save()
+
+    def restore(self, name: str, destination_directory: str = None):
+        # Read-only objects are cloned back as writable files
+        if destination_directory is None:
+            destination_directory = self.directory_path
+        os.makedirs(destination_directory, exist_ok=True)
+
+        for file, digest in self._index["snapshots"][name].items():
+            destination = f"{destination_directory}/{file}"
+            if os.path.lexists(destination):
+                os.remove(destination)
+            clone_file(self._object_path(digest), destination)
+            os.chmod(destination, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
+
+    def remove(self, name: str):
+        entries = self._index["snapshots"].pop(name)
+        shutil.rmtree(f"{self.directory_path}/{name}", ignore_errors=True)
+        self._save()
+
+        # Objects no other snapshot refers to are garbage
+        referenced = {digest for snapshot in self._index["snapshots"].values() for digest in snapshot.values()}
+        for digest in set(entries.values()) - referenced:
+            if os.path.exists(self._object_path(digest)):
+                os.remove(self._object_path(digest))
+
+    def _store_object(self, source: str, file: str, move: bool) -> str:
+        digest = self._hash(source, file)
+        object_path = self._object_path(digest)
+
+        if os.path.exists(object_path):
+            if move:
+                os.remove(source)
+                self._index["stat_cache"].pop(file, None)
+            return digest
+
+        # Write a temporary file first so that an interrupted snapshot never leaves a partial object
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        temporary_file = f"{object_path}.{os.getpid()}"
+        if move:
+            os.rename(source, temporary_file)
+            self._index["stat_cache"].pop(file, None)
+        else:
+            clone_file(source, temporary_file)
+        os.chmod(temporary_file, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.rename(temporary_file, object_path)
+
+        return digest
+
+    def _hash(self, source: str, file: str) -> str:
+        # Files whose size, modification time and inode did not change since the last snapshot are not read again
+        status = os.stat(source)
+        signature = [status.st_size, status.st_mtime_ns, status.st_ino]
+        cached = self._index["stat_cache"].get(file)
+        if cached is not None and cached[:3] == signature:
+            return cached[3]
+
+        hasher = hashlib.sha256()
+        with open(source, 'rb') as source_file:
+            for block in iter(lambda: source_file.read(1 << 20), b''):
+                hasher.update(block)
+        digest = hasher.hexdigest()
+
+        self._index["stat_cache"][file] = signature + [digest]
+        return digest
+
+    def _object_path(self, digest: str) -> str:
+        return f"{self.store_directory}/objects/{digest[:2]}/{digest}"
+
+    def _load(self):
+        if not os.path.exists(self._index_file):
+            return {"snapshots": {}, "stat_cache": {}}
+        with open(self._index_file) as file:
+            return json.load(file)
+
+    def _save(self):
+        temporary_file = f"{self._index_file}.{os.getpid()}"
+        with open(temporary_file, "w") as file:
+            json.dump(self._index, file, indent=2)
+        os.replace(temporary_file, self._index_file)
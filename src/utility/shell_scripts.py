@@ -94,6 +94,33 @@ cd {simulation_directory_path}
         file.write(allrun)
 
 
+def generate_batch_run_all(case_name: str or list,
+                           start_case: int,
+                           end_case: int,
+                           ranks: int,
+                           simulation_directory_path: str = "./simulations",
+                           options: list = None):
+    # Imported here to keep the plain shell script generation free of the runner
+    from src.runner.executor.executor import BatchExecutor
+
+    if type(case_name) is str:
+        case_name = [case_name]
+    case_directories = [f"{simulation_directory_path}/{name}{i}"
+                        for name in case_name for i in range(start_case, end_case)]
+
+    # HOPR -> PICLAS -> piclas2vtk job arrays, each element waits for the same element of the previous array
+    scripts = BatchExecutor(options=options).write_sweep(case_directories, ranks, script_directory=".")
+    submit_all = "#!/bin/bash\n"
+    dependency = ""
+    for script in scripts:
+        stage = os.path.basename(script).split("_array")[0]
+        submit_all += f"{stage}_job=$(sbatch --parsable {dependency}{script} | cut -d ';' -f 1)\n"
+        dependency = f"--dependency=aftercorr:${stage}_job "
+
+    with open(f"./submit_all.sh", "w") as file:
+        file.write(submit_all)
+
+
 def generate_clean_all(case_name: str or list, start_case: int, end_case: int,
                        simulation_directory_path: str = "./simulations"):
     if type(case_name) is str:
@@ -1,7 +1,14 @@
+import fcntl
 import os
+import shutil
 
 import numpy as np
 
+from src.utility.catalog import catalog
+
+# ioctl request for a copy-on-write clone of a whole file (btrfs, xfs)
+_FICLONE = 0x40049409
+
 
 def random_parameters(min_value: float,
                       max_value: float,
@@ -20,30 +27,54 @@ def same_parameters(value: float,
     return np.full(n, value)
 
 
+def find_dsmc_state_files(directory_path: str):
+    # DSMCState files in time order
+    return catalog(directory_path).files("DSMCState")
+
+
+def clone_file(source: str, destination: str):
+    # Reflink the file if the file system supports it, copy it otherwise
+    # The clone replaces the destination, an existing destination may be a hard link that must not be overwritten
+    temporary_file = f"{destination}.{os.getpid()}.clone"
+    try:
+        with open(source, 'rb') as src, open(temporary_file, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        shutil.copystat(source, temporary_file)
+    except OSError:
+        shutil.copy2(source, temporary_file)
+    os.replace(temporary_file, destination)
+
+
 def save_history(directory_path: str, index: int, history: str = 'history', STATE: bool = False):
-    # Create directory if it does not exist
-    history_directory = f'{directory_path}/{history}{str(index)}'
-    os.makedirs(history_directory, exist_ok=True)
+    # Imported here because the history store clones files with clone_file
+    from src.utility.history import HistoryStore
 
-    for file in os.listdir(directory_path):
+    files = []
+    move = []
+    for file in catalog(directory_path).files():
+        if not os.path.isfile(f'{directory_path}/{file}'):
+            continue
         if file.endswith('.h5') and '_DSMCState_' in file:
             # move the file to the history directory
-            os.rename(f'{directory_path}/{file}', f'{history_directory}/{file}')
+            move.append(file)
         elif file.endswith('.h5') and '_mesh' in file:
             # copy the file to the history directory
-            os.system(f'cp {directory_path}/{file} {history_directory}/{file}')
+            files.append(file)
         elif file.endswith('.h5') and STATE and '_State_' in file:
             # copy the file to the history directory
-            os.system(f'cp {directory_path}/{file} {history_directory}/{file}')
+            files.append(file)
         elif (file.endswith('.ini') or file.endswith('.geo') or file.endswith('.msh') or file.endswith('.log') or
               file.endswith('.sh') or file.endswith('.csv') or file.endswith('.dat') or file.endswith('.vtu')):
             # copy the file to the history directory
-            os.system(f'cp {directory_path}/{file} {history_directory}/{file}')
+            files.append(file)
+
+    # Files that did not change since an earlier snapshot are linked instead of copied
+    HistoryStore(directory_path).snapshot(f'{history}{str(index)}', files + move, move=move)
 
 
 def clean_up(directory_path: str):
     # Remove the files in the directory
-    for file in os.listdir(directory_path):
+    for file in catalog(directory_path).files():
         if file.endswith('.h5'):
             # if it is mesh file then skip
             if '_mesh' in file:
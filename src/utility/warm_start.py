@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from src.fluid.fluid import Fluid
+from src.geometry.geometry import Geometry
+from src.utility.cache import mesh_fingerprint
+from src.utility.catalog import catalog
+from src.utility.utility import clone_file
+
+
+def case_parameters(fluid: Fluid, geometry: Geometry) -> dict:
+    # Numerical options of the surface fluxes and the boundaries span the parameter space of a sweep
+    parameters = {}
+    for surface_flux in fluid.surface_fluxes:
+        for key in ("Adaptive-Pressure", "MWTemperatureIC", "TempVib", "TempRot", "VeloIC"):
+            parameters[f"{surface_flux['BC']}-{key}"] = float(surface_flux[key])
+
+    for boundary in geometry.get_all_boundaries():
+        for key, value in boundary.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                parameters[f"{boundary['SourceName']}-{key}"] = float(value)
+
+    return parameters
+
+
+def case_compatibility(fluid: Fluid, geometry: Geometry) -> str:
+    # A state can only be restarted on the same mesh with the same species and particle weight
+    compatibility = {
+        "mesh": mesh_fingerprint(geometry),
+        "species": fluid.get_properties()["Name"],
+        "collision_model": fluid.collision_model,
+        "macro_particle_factor": str(fluid.macro_particle_factor),
+        "boundaries": geometry.get_boundary_names(),
+        "options": geometry.get_boundary_options(),
+    }
+    return hashlib.sha256(json.dumps(compatibility, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class WarmStart:
+
+    def __init__(self,
+                 registry_file: str = None,
+                 max_distance: float = None):
+        if registry_file is None:
+            registry_file = os.path.expanduser("~/.cache/atlas/warm_start.json")
+        os.makedirs(os.path.dirname(registry_file), exist_ok=True)
+
+        self.registry_file = registry_file
+        self.max_distance = max_distance
+
+    def register(self, directory_path: str, project_name: str, fluid: Fluid, geometry: Geometry):
+        entries = [entry for entry in self._load() if entry["directory"] != os.path.abspath(directory_path)]
+        entries.append({
+            "directory": os.path.abspath(directory_path),
+            "project_name": project_name,
+            "compatibility": case_compatibility(fluid, geometry),
+            "parameters": case_parameters(fluid, geometry),
+        })
+        self._save(entries)
+
+    def find(self, fluid: Fluid, geometry: Geometry, exclude: str = None):
+        compatibility = case_compatibility(fluid, geometry)
+        parameters = case_parameters(fluid, geometry)
+
+        candidates = [entry for entry in self._load()
+                      if entry["compatibility"] == compatibility
+                      and entry["parameters"].keys() == parameters.keys()
+                      and entry["directory"] != exclude
+                      and self._latest_state_file(entry["directory"]) is not None]
+        if len(candidates) == 0:
+            return None
+
+        # Relative distance in parameter space, every parameter counts the same
+        keys = sorted(parameters)
+        target = np.array([parameters[key] for key in keys])
+        points = np.array([[entry["parameters"][key] for key in keys] for entry in candidates])
+        scale = np.maximum(np.maximum(np.abs(points), np.abs(target)), np.finfo(float).tiny)
+        distances = np.sqrt((((points - target) / scale) ** 2).sum(axis=1))
+
+        closest = int(np.argmin(distances))
+        if self.max_distance is not None and distances[closest] > self.max_distance:
+            return None
+
+        return candidates[closest]
+
+    def initialize(self, directory_path: str, project_name: str, fluid: Fluid, geometry: Geometry):
+        entry = self.find(fluid, geometry, exclude=os.path.abspath(directory_path))
+        if entry is None:
+            return None
+
+        # Copy the converged state under the name of the new project
+        state_file, time = self._latest_state_file(entry["directory"])
+        restart_file = f"{project_name}_State_{state_file.split('_State_')[-1]}"
+        clone_file(f"{entry['directory']}/{state_file}", f"{directory_path}/{restart_file}")
+
+        return restart_file, time
+
+    def _load(self):
+        if not os.path.exists(self.registry_file):
+            return []
+        with open(self.registry_file) as file:
+            return json.load(file)
+
+    def _save(self, entries: list):
+        temporary_file = f"{self.registry_file}.{os.getpid()}"
+        with open(temporary_file, "w") as file:
+            json.dump(entries, file, indent=2)
+        os.replace(temporary_file, self.registry_file)
+
+    @staticmethod
+    def _latest_state_file(directory_path: str):
+        if not os.path.isdir(directory_path):
+            return None
+
+        latest = catalog(directory_path).latest("State")
+        if latest is None:
+            return None
+
+        time, state_file = latest
+        return state_file, time
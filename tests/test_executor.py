@@ -0,0 +1,211 @@
+import os
+import stat
+import time
+
+import pytest
+
+from src.runner.executor.executor import BatchExecutor, HostfileExecutor, LocalExecutor
+from src.runner.monitor.monitor import Monitor
+from src.runner.parallel.parallel import Parallel
+from src.runner.runner import Runner
+
+# Two sockets with two cores each, the OS numbers the cpus alternately over the sockets
+TOPOLOGY = [
+    {"cpu": 0, "core": 0, "socket": 0, "numa": 0},
+    {"cpu": 1, "core": 0, "socket": 1, "numa": 1},
+    {"cpu": 2, "core": 1, "socket": 0, "numa": 0},
+    {"cpu": 3, "core": 1, "socket": 1, "numa": 1},
+]
+
+# The stubs record their arguments, one call per line, and exit with $STUB_EXIT
+STUB_MPIRUN = """#!/bin/bash
+echo "$@" >> "$STUB_DIRECTORY/mpirun.calls"
+echo "rank output"
+sleep "${STUB_SLEEP:-0}"
+exit "${STUB_EXIT:-0}"
+"""
+
+STUB_SBATCH = """#!/bin/bash
+echo "$@" >> "$STUB_DIRECTORY/sbatch.calls"
+if [ "${STUB_EXIT:-0}" != 0 ]; then
+    echo "sbatch: error: Batch job submission failed"
+    exit "$STUB_EXIT"
+fi
+echo "$(( $(wc -l < "$STUB_DIRECTORY/sbatch.calls") + 100 ));cluster"
+"""
+
+
+class StopMonitor(Monitor):
+
+    def __init__(self):
+        self.lines = []
+        self.finished = False
+
+    def read_line(self, line: str):
+        self.lines.append(line)
+
+    def update(self):
+        return True
+
+    def finish(self):
+        self.finished = True
+
+
+class FailingMonitor(Monitor):
+
+    def __init__(self, stage: str):
+        self._stage = stage
+
+    def read_line(self, line: str):
+        if self._stage == "read_line":
+            raise ValueError("column not found")
+
+    def update(self):
+        if self._stage == "update":
+            raise ValueError("column not found")
+        return False
+
+
+@pytest.fixture
+def stubs(tmp_path, monkeypatch):
+    stub_directory = tmp_path / "bin"
+    stub_directory.mkdir()
+    for name, content in (("mpirun", STUB_MPIRUN), ("sbatch", STUB_SBATCH)):
+        path = stub_directory / name
+        path.write_text(content)
+        path.chmod(path.stat().st_mode | stat.S_IXUSR)
+
+    monkeypatch.setenv("PATH", f"{stub_directory}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("STUB_DIRECTORY", str(stub_directory))
+    monkeypatch.setattr(Parallel, "topology", property(lambda self: TOPOLOGY))
+    return stub_directory
+
+
+def calls(stub_directory, name: str):
+    path = stub_directory / f"{name}.calls"
+    return path.read_text().splitlines() if path.exists() else []
+
+
+def test_logical_core_ids_follow_the_hwloc_order(stubs):
+    assert Parallel().logical_core_ids([0, 2, 1, 3]) == [0, 1, 2, 3]
+
+    with pytest.raises(ValueError):
+        Parallel().logical_core_ids([4])
+
+
+def test_local_executor_binds_ranks_to_logical_cores(stubs, tmp_path):
+    exit_code = LocalExecutor().execute(str(tmp_path), "piclas parameter.ini", log_file="piclas.log",
+                                        ranks=2, cores=[1, 3])
+
+    assert exit_code == 0
+    assert calls(stubs, "mpirun") == ["-np 2 --map-by pe-list=2,3:ordered --bind-to core piclas parameter.ini"]
+    assert (tmp_path / "piclas.log").read_text() == "rank output\n"
+
+
+def test_local_executor_returns_the_exit_code_of_mpirun(stubs, tmp_path, monkeypatch):
+    monkeypatch.setenv("STUB_EXIT", "3")
+
+    assert LocalExecutor().execute(str(tmp_path), "piclas parameter.ini", log_file="piclas.log", ranks=2) == 3
+    assert calls(stubs, "mpirun") == ["-np 2 piclas parameter.ini"]
+
+
+def test_local_executor_runs_serial_programs_without_mpirun(stubs, tmp_path):
+    assert LocalExecutor().execute(str(tmp_path), "true", log_file="hopr.log") == 0
+    assert calls(stubs, "mpirun") == []
+
+
+def test_local_executor_stops_when_a_monitor_asks_for_it(stubs, tmp_path, monkeypatch):
+    monkeypatch.setenv("STUB_SLEEP", "30")
+    monitor = StopMonitor()
+
+    exit_code = LocalExecutor(poll_interval=0.1).execute(str(tmp_path), "piclas parameter.ini",
+                                                         log_file="piclas.log", ranks=1, monitors=[monitor])
+
+    assert exit_code == 0
+    assert monitor.lines == ["rank output\n"]
+    assert monitor.finished
+
+
+@pytest.mark.parametrize("stage", ["update", "read_line"])
+def test_local_executor_terminates_the_job_if_a_monitor_fails(stubs, tmp_path, monkeypatch, stage):
+    monkeypatch.setenv("STUB_SLEEP", "30")
+    start = time.perf_counter()
+
+    with pytest.raises(ValueError):
+        LocalExecutor(poll_interval=0.1).execute(str(tmp_path), "piclas parameter.ini", log_file="piclas.log",
+                                                 ranks=1, monitors=[FailingMonitor(stage)])
+
+    assert time.perf_counter() - start < 10
+    assert (tmp_path / "piclas.log").read_text() == "rank output\n"
+
+
+def test_hostfile_executor_ignores_the_local_cores(stubs, tmp_path):
+    hostfile = tmp_path / "hosts"
+    hostfile.write_text("node1 slots=4\nnode2 slots=4\n")
+
+    exit_code = HostfileExecutor(str(hostfile)).execute(str(tmp_path), "piclas parameter.ini",
+                                                        log_file="piclas.log", ranks=8, cores=[0, 1])
+
+    assert exit_code == 0
+    assert calls(stubs, "mpirun") == [f"-np 8 --hostfile {hostfile} --map-by node piclas parameter.ini"]
+
+
+def test_batch_executor_chains_the_stages_of_a_case(stubs, tmp_path):
+    executor = BatchExecutor(options=["--partition=short"])
+    case_directory = str(tmp_path)
+
+    assert not executor.is_local
+    assert executor.execute(case_directory, "hopr hopr.ini", log_file="hopr.log", stage="hopr") == 0
+    assert executor.execute(case_directory, "piclas parameter.ini", log_file="piclas.log",
+                            ranks=4, stage="piclas") == 0
+
+    assert calls(stubs, "sbatch") == [
+        f"--parsable {tmp_path}/hopr.sbatch",
+        f"--parsable --dependency=afterok:101 {tmp_path}/piclas.sbatch",
+    ]
+    assert executor.last_jobs == {case_directory: "102"}
+
+    script = (tmp_path / "piclas.sbatch").read_text()
+    assert "#SBATCH --ntasks=4\n" in script
+    assert "#SBATCH --partition=short\n" in script
+    assert script.endswith(f"cd {tmp_path}\nmpirun -np 4 piclas parameter.ini\n")
+    assert calls(stubs, "mpirun") == []
+
+
+def test_batch_executor_reports_a_failed_submission(stubs, tmp_path, monkeypatch):
+    monkeypatch.setenv("STUB_EXIT", "1")
+    executor = BatchExecutor()
+
+    with pytest.warns(UserWarning, match="Batch job submission failed"):
+        assert executor.execute(str(tmp_path), "hopr hopr.ini", log_file="hopr.log", stage="hopr") == 1
+    assert executor.last_jobs == {}
+
+
+def test_batch_executor_chains_the_sweep_arrays_element_by_element(stubs, tmp_path):
+    case_directories = [str(tmp_path / f"case_{index}") for index in range(3)]
+
+    job_ids = BatchExecutor().submit_sweep(case_directories, ranks=4, script_directory=str(tmp_path / "jobs"))
+
+    assert job_ids == {"hopr": "101", "piclas": "102", "piclas2vtk": "103"}
+    assert calls(stubs, "sbatch") == [
+        f"--parsable {tmp_path}/jobs/hopr_array.sbatch",
+        f"--parsable --dependency=aftercorr:101 {tmp_path}/jobs/piclas_array.sbatch",
+        f"--parsable --dependency=aftercorr:102 {tmp_path}/jobs/piclas2vtk_array.sbatch",
+    ]
+    assert "#SBATCH --array=0-2\n" in (tmp_path / "jobs" / "piclas_array.sbatch").read_text()
+
+
+def test_batch_executor_raises_if_the_sweep_cannot_be_submitted(stubs, tmp_path, monkeypatch):
+    monkeypatch.setenv("STUB_EXIT", "1")
+
+    with pytest.raises(RuntimeError), pytest.warns(UserWarning, match="Batch job submission failed"):
+        BatchExecutor().submit_sweep([str(tmp_path)], ranks=4, script_directory=str(tmp_path / "jobs"))
+
+
+def test_runner_submits_the_conversion_as_a_job_of_its_own(stubs, tmp_path):
+    runner = Runner(directory_path=str(tmp_path), parallel=4, executor=BatchExecutor())
+
+    assert runner.run(HOPR=True, PICLAS=True, PICLAS2VTK=True) == 0
+    assert [call.split()[-1] for call in calls(stubs, "sbatch")] == [
+        f"{tmp_path}/hopr.sbatch", f"{tmp_path}/piclas.sbatch", f"{tmp_path}/piclas2vtk.sbatch"]
+    assert calls(stubs, "sbatch")[2].split()[1] == "--dependency=afterok:102"